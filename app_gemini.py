@@ -1,26 +1,76 @@
 """
 Flask Web Application with Gemini API Integration
 Web interface for the Government Services Chatbot with AI-powered navigation
+
+Both server configurations are built by create_app(gemini_enabled=...);
+app.py instantiates the plain (local-only) variant from the same factory
+
+Production: gunicorn -c gunicorn_conf.py app_gemini:app
 """
 
-from flask import Flask, render_template, request, jsonify, session
+# gevent monkey-patching must run before anything imports socket/ssl so the
+# blocking Gemini HTTP calls yield cooperatively under gunicorn's gevent workers
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass  # gevent not installed - plain threaded/dev mode
+
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import sys
 import os
-from datetime import datetime
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from datetime import datetime, timedelta
+from functools import lru_cache
 import uuid
+import logging
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import keyring
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from chatbot_engine.chatbot import GovernmentChatbot
 
-# Initialize Flask app
-app = Flask(__name__)
-app.secret_key = 'your-secret-key-change-in-production'
-CORS(app)
+# orjson (C-implemented) is 2-5x faster than stdlib json on encode/decode;
+# fall back cleanly when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        """Flask JSON provider backed by orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+# Server-side sessions: with Redis configured the cookie carries only a short
+# opaque id, instead of an HMAC-signed payload re-signed on every response;
+# sessions are also shared consistently across gunicorn workers
+try:
+    from flask_session import Session
+    import redis
+except ImportError:
+    Session = None  # Flask-Session/redis not installed - default signed-cookie sessions
+
+# Longest message we will embed / forward to Gemini
+MAX_MESSAGE_CHARS = 4000
 
 # Initialize chatbot (will be loaded on first request)
 chatbot = None
@@ -31,257 +81,817 @@ DB_PATH = 'data/scraped/government_data.db'
 # Gemini API Configuration - Stored securely in Windows Credential Manager
 SERVICE_NAME = 'TN_Gov_Chatbot'
 API_KEY_NAME = 'GEMINI_API_KEY'
-
-def get_api_key():
-    """Retrieve API key from secure storage"""
+# Using gemini-flash-latest as generic fallback
+GEMINI_MODEL_NAME = 'gemini-flash-latest'
+
+# Pooled keep-alive session for Gemini calls - reusing connections avoids a
+# fresh TCP+TLS handshake to googleapis.com on every request
+_GEMINI_SESSION = requests.Session()
+_GEMINI_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+))
+
+# Prefer httpx when available: HTTP/2 multiplexes many in-flight Gemini calls
+# over one connection, and gevent keeps the socket I/O cooperative
+try:
+    import httpx
     try:
-        return keyring.get_password(SERVICE_NAME, API_KEY_NAME)
-    except Exception as e:
-        print(f"Error retrieving API key: {e}")
+        _HTTPX_CLIENT = httpx.Client(
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+    except ImportError:  # h2 extra not installed - plain HTTP/1.1 client
+        _HTTPX_CLIENT = httpx.Client(timeout=30)
+except ImportError:
+    _HTTPX_CLIENT = None
+
+# Semantic cache settings - skip the Gemini round-trip for near-identical queries
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL = 3600  # 1 hour
+SEMANTIC_CACHE_MAX_ENTRIES = 512
+# Sessions tracked at once - visitors get a fresh uuid4 session each, so
+# without a cap departed sessions would pin their embeddings forever
+SEMANTIC_CACHE_MAX_SESSIONS = 256
+
+
+class SemanticResponseCache:
+    """
+    Embedding-similarity cache for Gemini responses
+    Stores (embedding, response, timestamp) entries per session so that
+    semantically identical queries skip the Gemini API call entirely
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                 max_sessions=SEMANTIC_CACHE_MAX_SESSIONS):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        # session_id -> list of (embedding, response, timestamp), LRU by
+        # session so abandoned sessions fall out instead of leaking
+        self._entries = OrderedDict()
+
+    def lookup(self, session_id, query_embedding):
+        """Return a cached response if a similar-enough query was seen recently"""
+        entries = self._entries.get(session_id)
+        if not entries:
+            return None
+        self._entries.move_to_end(session_id)
+
+        now = time.time()
+        # Drop expired entries while we're here
+        entries[:] = [e for e in entries if now - e[2] < self.ttl]
+
+        query_norm = np.linalg.norm(query_embedding)
+        if query_norm == 0:
+            return None
+
+        best_score = 0.0
+        best_response = None
+        for embedding, response, _ in entries:
+            score = np.dot(query_embedding, embedding) / (
+                query_norm * np.linalg.norm(embedding) + 1e-10
+            )
+            if score > best_score:
+                best_score = score
+                best_response = response
+
+        if best_score >= self.threshold:
+            logger.debug("Semantic cache hit (score: %.3f)", best_score)
+            return best_response
         return None
 
+    def store(self, session_id, query_embedding, response):
+        """Add a new (embedding, response) entry for this session"""
+        entries = self._entries.setdefault(session_id, [])
+        self._entries.move_to_end(session_id)
+        entries.append((query_embedding, response, time.time()))
+        if len(entries) > self.max_entries:
+            del entries[0]
+        # Evict the least recently used session once the cap is hit
+        if len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+
+semantic_cache = SemanticResponseCache()
+
+# Background pool so the local RAG lookup overlaps with cache checks and
+# Gemini call setup instead of running serially in front of them
+_context_pool = ThreadPoolExecutor(max_workers=4)
+# How long the Gemini path waits for local context before going without it
+CONTEXT_WAIT_SECONDS = 0.25
+
+# Static navigation instructions, built once at import - sent as the
+# system_instruction so the byte-identical prefix is cacheable server-side
+# and only the small dynamic suffix changes per request
+GEMINI_SYSTEM_PROMPT = """You are an expert assistant for the Tamil Nadu e-Sevai Portal (https://www.tnesevai.tn.gov.in/).
+
+Website Context:
+- TN e-Sevai is the official Tamil Nadu Government online services portal
+- Provides government certificates and services online
+- Services include: Birth Certificate, Income Certificate, Community Certificate, Ration Card, etc.
+- Users need to login or register to apply for services
+
+Your task as a website navigation assistant:
+1. Guide users on how to navigate the TN e-Sevai website
+2. Explain step-by-step where to click and what to do
+3. Help with login, registration, and service application processes
+4. Provide information about required documents
+5. Be specific about menu items, buttons, and navigation paths
+6. Speak in a friendly, helpful tone
+7. If the user asks to navigate or perform an action, provide clear instructions
+
+Provide a helpful, conversational response with specific navigation instructions."""
+
+# Exact-match LRU cache for Gemini responses - identical prompts produce
+# identical outputs, so repeats cost zero API calls
+GEMINI_EXACT_CACHE_MAXSIZE = 1024
+_gemini_exact_cache = OrderedDict()
+
+
+def _exact_cache_get(key):
+    """O(1) lookup in the exact-match cache, refreshing LRU order"""
+    response = _gemini_exact_cache.get(key)
+    if response is not None:
+        _gemini_exact_cache.move_to_end(key)
+    return response
+
+
+def _exact_cache_put(key, response):
+    """Store a response, evicting the least recently used entry when full"""
+    _gemini_exact_cache[key] = response
+    _gemini_exact_cache.move_to_end(key)
+    if len(_gemini_exact_cache) > GEMINI_EXACT_CACHE_MAXSIZE:
+        _gemini_exact_cache.popitem(last=False)
+
+
+class _InflightCall:
+    """A Gemini call in progress that other requests can wait on"""
+
+    __slots__ = ('done', 'result')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class GeminiRequestCoalescer:
+    """
+    Collapses concurrent identical Gemini prompts into one upstream call
+    Under load, N users asking the same question at the same time would
+    otherwise trigger N independent API round-trips; here the first request
+    does the work and the rest wait on its result
+    """
+
+    def __init__(self, wait_timeout=35):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._inflight = {}  # prompt key -> _InflightCall
+
+    def call(self, key, fn):
+        """Run fn() once per in-flight key; followers share the result"""
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is None:
+                call = _InflightCall()
+                self._inflight[key] = call
+                is_leader = True
+            else:
+                is_leader = False
+
+        if is_leader:
+            try:
+                call.result = fn()
+            finally:
+                call.done.set()
+                with self._lock:
+                    self._inflight.pop(key, None)
+            return call.result
+
+        call.done.wait(timeout=self.wait_timeout)
+        return call.result
+
+
+_gemini_coalescer = GeminiRequestCoalescer()
+
+# Cached API key - keyring crosses into the OS credential store (DPAPI on
+# Windows), so look it up once and keep the string
+_api_key = None
+_gemini_lock = threading.Lock()
+# When init fails (no key, keyring error), retry on a timer instead of
+# hitting the credential store again on every request
+_gemini_last_init_attempt = None
+GEMINI_INIT_RETRY_SECONDS = 60
+
+
+def get_api_key():
+    """Retrieve API key from secure storage (cached after first lookup)"""
+    global _api_key
+    if _api_key is None:
+        try:
+            _api_key = keyring.get_password(SERVICE_NAME, API_KEY_NAME)
+        except Exception as e:
+            logger.error("Error retrieving API key: %s", e)
+            return None
+    return _api_key
+
+
+def _ensure_gemini():
+    """Initialize Gemini at most once, double-checked under a lock
+
+    Failed attempts are only retried every GEMINI_INIT_RETRY_SECONDS
+    """
+    global _gemini_last_init_attempt
+    if gemini_model is None:
+        with _gemini_lock:
+            if gemini_model is None:
+                now = time.monotonic()
+                if (_gemini_last_init_attempt is None or
+                        now - _gemini_last_init_attempt >= GEMINI_INIT_RETRY_SECONDS):
+                    _gemini_last_init_attempt = now
+                    initialize_gemini()
+    return gemini_model
+
 
 def initialize_gemini():
     """Initialize Gemini API"""
     global gemini_model
     api_key = get_api_key()
     if not api_key:
-        print("⚠️ Warning: GEMINI_API_KEY not found in secure storage")
-        print("   Run 'python setup_gemini_key.py' to set your API key")
+        logger.warning("GEMINI_API_KEY not found in secure storage; "
+                       "run 'python setup_gemini_key.py' to set your API key")
         return None
     
     try:
         # Store API key for REST API calls
         gemini_model = {'api_key': api_key}
-        print("✓ Gemini API initialized successfully (using REST API)")
+        logger.info("Gemini API initialized successfully (using REST API)")
         return gemini_model
     except Exception as e:
-        print(f"❌ Error initializing Gemini: {e}")
+        logger.error("Error initializing Gemini: %s", e)
         return None
 
 
+_chatbot_lock = threading.Lock()
+
+
 def get_chatbot():
-    """Get or initialize chatbot instance"""
+    """Get or initialize chatbot instance (double-checked under a lock)"""
     global chatbot
     if chatbot is None:
-        try:
-            chatbot = GovernmentChatbot(KB_PATH, DB_PATH)
-        except Exception as e:
-            print(f"Error initializing chatbot: {e}")
-            return None
+        with _chatbot_lock:
+            if chatbot is None:
+                try:
+                    chatbot = GovernmentChatbot(KB_PATH, DB_PATH)
+                except Exception as e:
+                    logger.error("Error initializing chatbot: %s", e)
+                    return None
     return chatbot
 
 
-def get_gemini_navigation_response(user_message, context="", page_content="", user_name="User", image_data=None):
-    """Get Gemini-powered response for website navigation"""
-    if not gemini_model:
-        print("⚠ Gemini model not initialized")
-        return None
-    
-    try:
-        # Create a prompt specifically for TN e-Sevai website navigation
-        prompt = f"""You are an expert assistant for the Tamil Nadu e-Sevai Portal (https://www.tnesevai.tn.gov.in/).
+# Pay the model-load cost at boot (or in the gunicorn master with
+# preload_app) rather than on the first user's request
+if os.path.exists(KB_PATH):
+    get_chatbot()
+
+
+@lru_cache(maxsize=2048)
+def _cached_bot_chat(user_message):
+    """
+    Run the local RAG pipeline once per unique message
+    Uses the history-free answer() path so cached replays don't mutate
+    conversation state; raises if the chatbot is unavailable (not cached)
+    """
+    return get_chatbot().answer(user_message)
+
+
+# Canonical queries users actually send, used to pre-warm the local RAG
+# cache at boot so the first real request hits warm paths
+WARM_QUERIES = (
+    "birth certificate",
+    "How to apply for birth certificate?",
+    "How to apply for birth certificate online?",
+    "birth certificate documents required",
+    "birth certificate fees",
+    "income certificate",
+    "How to apply for income certificate?",
+    "income certificate documents required",
+    "income certificate fees",
+    "income certificate processing time",
+    "community certificate",
+    "How to apply for community certificate?",
+    "community certificate documents required",
+    "community certificate fees",
+    "ration card",
+    "How to apply for ration card?",
+    "ration card status",
+    "new ration card application",
+    "ration card documents required",
+    "add family member to ration card",
+    "How to login to e-Sevai portal?",
+    "How to register on e-Sevai portal?",
+    "e-Sevai center near me",
+    "What services are available?",
+    "What certificates can I apply for?",
+    "Revenue Department services",
+    "Civil Supplies Department services",
+    "nativity certificate",
+    "first graduate certificate",
+    "legal heir certificate",
+    "residence certificate",
+    "caste certificate",
+    "How to check application status?",
+    "How to download my certificate?",
+    "What documents do I need?",
+    "application fees",
+    "contact number for government services",
+    "helpline number",
+    "பிறப்பு சான்றிதழ்",
+    "பிறப்பு சான்றிதழ் எப்படி விண்ணப்பிப்பது?",
+    "வருமான சான்றிதழ்",
+    "வருமான சான்றிதழுக்கு என்ன ஆவணங்கள் தேவை?",
+    "சமூக சான்றிதழ்",
+    "ரேஷன் அட்டை",
+    "ரேஷன் அட்டை நிலை",
+    "hello",
+    "hi",
+    "vanakkam",
+    "thanks",
+    "bye",
+)
+
+_warm_cache_started = False
+_warm_cache_lock = threading.Lock()
+
+
+def warm_cache():
+    """
+    Pre-warm the local RAG caches for the canonical queries in the background
+    Each call runs the full embed + search + format pipeline once, so
+    _cached_bot_chat (and the vectorizer/model internals) are hot before the
+    first real user arrives; set WARM_GEMINI_CACHE=1 to also prime the Gemini
+    exact cache (off by default - it spends API quota)
+    """
+    global _warm_cache_started
+    with _warm_cache_lock:
+        if _warm_cache_started:
+            return
+        _warm_cache_started = True
+
+    warm_gemini = os.environ.get('WARM_GEMINI_CACHE') == '1'
+
+    def _warm():
+        warmed = 0
+        for query in WARM_QUERIES:
+            try:
+                result = _cached_bot_chat(query)
+                if warm_gemini and _ensure_gemini():
+                    get_gemini_navigation_response(query, result['text'])
+                warmed += 1
+            except Exception as e:
+                logger.debug("Cache warm failed for %r: %s", query, e)
+        logger.info("Cache warming complete (%d/%d queries)", warmed, len(WARM_QUERIES))
+
+    # Fire-and-forget: boot must not wait on warming
+    threading.Thread(target=_warm, name='cache-warmer', daemon=True).start()
+
+
+# Fixed prompt segments, interleaved with the per-request values by a
+# single "".join below - no per-call f-string formatting of static text
+_PROMPT_NAME = "User Name: "
+_PROMPT_PAGE = "\n\nCurrent Page Content:\n"
+_PROMPT_QUESTION = "\n\nUser's question: "
+_PROMPT_CONTEXT = "\n\nKnowledge base context: "
+_PROMPT_IMAGE_NOTE = "\n\n[User has provided an image to assist with the query]"
+
+
+def _build_generate_request(user_message, context="", page_content="", user_name="User", image_data=None):
+    """Build the generateContent request body shared by the blocking and streaming paths"""
+    # Only the per-request details go into the prompt - the navigation
+    # instructions ride along as the static system_instruction
+    pieces = [
+        _PROMPT_NAME, user_name,
+        _PROMPT_PAGE, page_content[:2000] if page_content else "Not available",
+        _PROMPT_QUESTION, user_message,
+        _PROMPT_CONTEXT, context,
+    ]
+    if image_data:
+        pieces.append(_PROMPT_IMAGE_NOTE)
+    prompt = "".join(pieces)
+
+    # Construct message parts
+    parts = [{"text": prompt}]
+
+    if image_data:
+        # Parse data URI: data:image/png;base64,....
+        try:
+            header, base64_str = image_data.split(',', 1)
+            mime_type = header.split(':')[1].split(';')[0]
+
+            parts.append({
+                "inline_data": {
+                    "mime_type": mime_type,
+                    "data": base64_str
+                }
+            })
+            logger.debug("Added image to request (%s)", mime_type)
+        except Exception as e:
+            logger.warning("Error parsing image data: %s", e)
+
+    return {
+        "system_instruction": {
+            "parts": [{"text": GEMINI_SYSTEM_PROMPT}]
+        },
+        "contents": [{
+            "parts": parts
+        }],
+        # Deterministic, bounded output: latency scales with generated
+        # tokens, and temperature 0 makes responses exact-cacheable
+        "generationConfig": {
+            "temperature": 0.0,
+            "topP": 1.0,
+            "maxOutputTokens": 512,
+            "candidateCount": 1
+        }
+    }
+
+
+def stream_gemini_navigation_response(user_message, context="", page_content="", user_name="User"):
+    """
+    Yield Gemini response text chunks via streamGenerateContent
+    Lets the client render tokens as they arrive instead of waiting for
+    the full multi-second generation
+    """
+    api_key = gemini_model['api_key']
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_NAME}:streamGenerateContent?alt=sse&key={api_key}"
+
+    data = _build_generate_request(user_message, context, page_content, user_name)
+
+    response = _GEMINI_SESSION.post(
+        url, headers={'Content-Type': 'application/json'}, json=data,
+        timeout=30, stream=True
+    )
+    if response.status_code != 200:
+        raise Exception(f"API returned {response.status_code}: {response.text}")
+
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data: '):
+            continue
+        try:
+            chunk = json.loads(line[len('data: '):])
+            text = chunk['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, ValueError):
+            continue
+        if text:
+            yield text
+
+
+def _post_generate_content(url, headers, data):
+    """Issue a single generateContent POST and return the response text"""
+    if orjson is not None:
+        body = orjson.dumps(data)
+        if _HTTPX_CLIENT is not None:
+            response = _HTTPX_CLIENT.post(url, headers=headers, content=body)
+        else:
+            response = _GEMINI_SESSION.post(url, headers=headers, data=body, timeout=30)
+    elif _HTTPX_CLIENT is not None:
+        response = _HTTPX_CLIENT.post(url, headers=headers, json=data)
+    else:
+        response = _GEMINI_SESSION.post(url, headers=headers, json=data, timeout=30)
 
-User Name: {user_name}
+    if response.status_code == 200:
+        result = orjson.loads(response.content) if orjson is not None else response.json()
+        return result['candidates'][0]['content']['parts'][0]['text']
 
-Website Context:
-- TN e-Sevai is the official Tamil Nadu Government online services portal
-- Provides government certificates and services online
-- Services include: Birth Certificate, Income Certificate, Community Certificate, Ration Card, etc.
-- Users need to login or register to apply for services
+    raise Exception(f"API returned {response.status_code}: {response.text}")
 
-Current Page Content:
-{page_content[:2000] if page_content else "Not available"}
 
-User's question: {user_message}
+def get_gemini_navigation_response(user_message, context="", page_content="", user_name="User", image_data=None, no_cache=False):
+    """Get Gemini-powered response for website navigation"""
+    if not gemini_model:
+        logger.warning("Gemini model not initialized")
+        return None
 
-Knowledge base context: {context}
-"""
-        if image_data:
-             prompt += "\n\n[User has provided an image to assist with the query]"
+    # Exact repeats of the same prompt inputs hit the LRU cache
+    # (image requests are not cacheable - payloads are large and one-off)
+    cache_key = None
+    if not no_cache and image_data is None:
+        cache_key = (user_message, context, page_content, user_name)
+        cached = _exact_cache_get(cache_key)
+        if cached is not None:
+            logger.debug("Exact-match cache hit")
+            return cached
 
-        prompt += """
-Your task as a website navigation assistant:
-1. Guide users on how to navigate the TN e-Sevai website
-2. Explain step-by-step where to click and what to do
-3. Help with login, registration, and service application processes
-4. Provide information about required documents
-5. Be specific about menu items, buttons, and navigation paths
-6. Speak in a friendly, helpful tone
-7. If the user asks to navigate or perform an action, provide clear instructions
+    try:
+        logger.debug("Calling Gemini API for: %.50s...", user_message)
 
-Provide a helpful, conversational response with specific navigation instructions:"""
-        
-        print(f"🤖 Calling Gemini API for: {user_message[:50]}...")
-        
         # Use REST API directly - more reliable
         # Using gemini-flash-latest as generic fallback
         api_key = gemini_model['api_key']
-        # url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={api_key}"
-        
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_NAME}:generateContent?key={api_key}"
+
         headers = {'Content-Type': 'application/json'}
-        
-        # Construct message parts
-        parts = [{"text": prompt}]
-        
-        if image_data:
-            # Parse data URI: data:image/png;base64,....
-            try:
-                header, base64_str = image_data.split(',', 1)
-                mime_type = header.split(':')[1].split(';')[0]
-                
-                parts.append({
-                    "inline_data": {
-                        "mime_type": mime_type,
-                        "data": base64_str
-                    }
-                })
-                print(f"✓ Added image to request ({mime_type})")
-            except Exception as e:
-                print(f"⚠ Error parsing image data: {e}")
+        data = _build_generate_request(user_message, context, page_content, user_name, image_data)
 
-        data = {
-            "contents": [{
-                "parts": parts
-            }]
-        }
-        
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                text = result['candidates'][0]['content']['parts'][0]['text']
-                print(f"✓ Gemini responded successfully")
-                return text
+            def _do_call():
+                return _post_generate_content(url, headers, data)
+
+            if image_data is None:
+                # Concurrent identical prompts share one upstream round-trip
+                text = _gemini_coalescer.call(
+                    (user_message, context, page_content, user_name), _do_call
+                )
             else:
-                raise Exception(f"API returned {response.status_code}: {response.text}")
+                text = _do_call()
+
+            if text is not None:
+                logger.debug("Gemini responded successfully")
+                if cache_key is not None:
+                    _exact_cache_put(cache_key, text)
+            return text
         except Exception as e:
-            print(f"❌ Error with Gemini API request: {e}")
+            logger.error("Error with Gemini API request: %s", e)
             return None
 
     except Exception as e:
-        print(f"❌ Error in get_gemini_navigation_response: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_gemini_navigation_response: %s", e)
         return None
 
 
-@app.route('/')
-def index():
-    """Render main chat interface"""
-    # Initialize session ID if not exists
-    if 'session_id' not in session:
-        session['session_id'] = str(uuid.uuid4())
-    
-    return render_template('index.html')
+def create_app(gemini_enabled=True):
+    """
+    Application factory shared by the plain and Gemini-enhanced configurations
+    The two former modules defined near-identical views around one chatbot;
+    building both from a single factory keeps a single chatbot (and embedding
+    model) in memory and plays cleanly with gunicorn's preload_app
+    """
+    app = Flask(__name__)
+    app.secret_key = 'your-secret-key-change-in-production'
+    # Reject oversized bodies before JSON parsing allocates for them; the
+    # Gemini configuration accepts page_content from the extension so it
+    # needs headroom, the plain one only carries the message itself
+    app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 if gemini_enabled else 16 * 1024
+    CORS(app)
+
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    if Session is not None:
+        _redis_url = os.environ.get('SESSION_REDIS_URL')
+        if _redis_url:
+            app.config.update(
+                SESSION_TYPE='redis',
+                SESSION_REDIS=redis.from_url(_redis_url),
+                SESSION_USE_SIGNER=True,
+                PERMANENT_SESSION_LIFETIME=timedelta(hours=2)
+            )
+            Session(app)
+            logger.info("Server-side Redis sessions enabled")
+
+    @app.route('/')
+    def index():
+        """Render main chat interface"""
+        # Initialize session ID if not exists
+        if 'session_id' not in session:
+            session['session_id'] = str(uuid.uuid4())
+
+        return render_template('index.html')
+
+    @app.route('/api/chat', methods=['POST'])
+    def chat():
+        """Handle chat messages (Gemini-first when enabled, local otherwise)"""
+        try:
+            # cache=False keeps Flask from stashing the parsed body on the
+            # request object for the lifetime of the greenlet
+            data = request.get_json(silent=True, cache=False) or {}
+            user_message = data.get('message', '').strip()
+            page_content = data.get('page_content', '')
+            user_name = data.get('user_name', 'User')
+            # Allow callers to bypass caching for sensitive prompts
+            no_cache = bool(data.get('no_cache')) or request.headers.get('X-No-Cache') == '1'
+
+            if not user_message:
+                return jsonify({
+                    'success': False,
+                    'error': 'Empty message'
+                }), 400
+
+            if len(user_message) > MAX_MESSAGE_CHARS:
+                return jsonify({
+                    'success': False,
+                    'error': 'Message too long'
+                }), 413
 
+            # One timestamp per request, reused by every response branch
+            now = datetime.now().isoformat()
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    """Handle chat messages with Gemini integration"""
-    try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
-        page_content = data.get('page_content', '')
-        user_name = data.get('user_name', 'User')
-        
-        if not user_message:
-            return jsonify({
-                'success': False,
-                'error': 'Empty message'
-            }), 400
-        
-        # Initialize Gemini if not already done
-        global gemini_model
-        if gemini_model is None:
-            initialize_gemini()
-        
-        # Initialize Gemini first - it's the primary handler now
-        if gemini_model is None:
-            initialize_gemini()
-        
-        # Try Gemini first (primary mode)
-        if gemini_model:
-            # Get knowledge base context (optional)
-            context = ""
-            try:
+            if not gemini_enabled:
                 bot = get_chatbot()
-                if bot:
-                    bot_response = bot.chat(user_message)
-                    context = bot_response['text']
-            except Exception as e:
-                print(f"⚠ Could not get local context: {e}")
-            
-            # Let Gemini handle everything
-            gemini_response = get_gemini_navigation_response(user_message, context, page_content, user_name)
-            
-            if gemini_response:
-                print(f"✓ Gemini handled query: {user_message[:50]}...")
+                if bot is None:
+                    return jsonify({
+                        'success': False,
+                        'error': 'Chatbot not initialized. Please run setup first.'
+                    }), 500
+
+                response = bot.chat(user_message)
                 return jsonify({
                     'success': True,
-                    'response': gemini_response,
-                    'type': 'gemini_full',
-                    'language': 'en',
-                    'enhanced': True,
-                    'timestamp': datetime.now().isoformat()
+                    'response': response['text'],
+                    'type': response['type'],
+                    'language': response['language'],
+                    'timestamp': now
                 })
-        
-        # Fallback to local chatbot only if Gemini fails
-        print(f"⚠ Gemini unavailable, using local chatbot for: {user_message[:50]}...")
-        bot = get_chatbot()
-        if bot is None:
+
+            # Kick off the local RAG lookup right away - it runs while we do
+            # the cache checks and Gemini call setup below
+            context_future = _context_pool.submit(_cached_bot_chat, user_message)
+
+            # Initialize Gemini if not already done - it's the primary handler
+            _ensure_gemini()
+
+            # Try Gemini first (primary mode)
+            if gemini_model:
+                session_id = session.get('session_id', 'default')
+
+                # Check semantic cache first - a similar recent query means
+                # we can skip the whole Gemini round-trip
+                query_embedding = None
+                if not no_cache:
+                    try:
+                        bot = get_chatbot()
+                        if bot:
+                            query_embedding = bot.embedding_generator.generate_embedding(user_message)
+                            cached_response = semantic_cache.lookup(session_id, query_embedding)
+                            if cached_response:
+                                return jsonify({
+                                    'success': True,
+                                    'response': cached_response,
+                                    'type': 'gemini_cached',
+                                    'language': 'en',
+                                    'enhanced': True,
+                                    'timestamp': now
+                                })
+                    except Exception as e:
+                        logger.warning("Semantic cache lookup failed: %s", e)
+
+                # Take whatever local context is ready by now (optional) - the
+                # prompt tolerates empty context, so never let a slow local
+                # pipeline sit on the Gemini critical path
+                context = ""
+                try:
+                    context = context_future.result(timeout=CONTEXT_WAIT_SECONDS)['text']
+                except FuturesTimeoutError:
+                    logger.debug("Local context not ready in time, proceeding without it")
+                except Exception as e:
+                    logger.warning("Could not get local context: %s", e)
+
+                # Let Gemini handle everything
+                gemini_response = get_gemini_navigation_response(user_message, context, page_content, user_name, no_cache=no_cache)
+
+                if gemini_response:
+                    if query_embedding is not None:
+                        semantic_cache.store(session_id, query_embedding, gemini_response)
+                    logger.debug("Gemini handled query: %.50s...", user_message)
+                    return jsonify({
+                        'success': True,
+                        'response': gemini_response,
+                        'type': 'gemini_full',
+                        'language': 'en',
+                        'enhanced': True,
+                        'timestamp': now
+                    })
+
+            # Fallback to local chatbot only if Gemini fails
+            logger.info("Gemini unavailable, using local chatbot for: %.50s...", user_message)
+            bot = get_chatbot()
+            if bot is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Both Gemini and local chatbot unavailable.'
+                }), 500
+
+            chatbot_response = context_future.result()
+
+            return jsonify({
+                'success': True,
+                'response': chatbot_response['text'],
+                'type': chatbot_response['type'],
+                'language': chatbot_response['language'],
+                'enhanced': False,
+                'timestamp': now
+            })
+
+        except HTTPException:
+            # Let Flask render its own error (e.g. the 413 raised by
+            # MAX_CONTENT_LENGTH inside get_json) instead of masking it as 500
+            raise
+        except Exception as e:
+            logger.exception("Error in chat endpoint: %s", e)
             return jsonify({
                 'success': False,
-                'error': 'Both Gemini and local chatbot unavailable.'
+                'error': str(e)
             }), 500
-        
-        chatbot_response = bot.chat(user_message)
-        
-        return jsonify({
-            'success': True,
-            'response': chatbot_response['text'],
-            'type': chatbot_response['type'],
-            'language': chatbot_response['language'],
-            'enhanced': False,
+
+    if gemini_enabled:
+        @app.route('/api/chat/stream', methods=['POST'])
+        def chat_stream():
+            """Stream a Gemini answer as Server-Sent Events (perceived latency drops to time-to-first-token)"""
+            data = request.get_json(silent=True, cache=False) or {}
+            user_message = data.get('message', '').strip()
+            page_content = data.get('page_content', '')
+            user_name = data.get('user_name', 'User')
+
+            if not user_message:
+                return jsonify({
+                    'success': False,
+                    'error': 'Empty message'
+                }), 400
+
+            if len(user_message) > MAX_MESSAGE_CHARS:
+                return jsonify({
+                    'success': False,
+                    'error': 'Message too long'
+                }), 413
+
+            _ensure_gemini()
+            if gemini_model is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Gemini not available - use /api/chat for the local fallback'
+                }), 503
+
+            # Local context before streaming starts (cached per unique message)
+            context = ""
+            try:
+                context = _cached_bot_chat(user_message)['text']
+            except Exception as e:
+                logger.warning("Could not get local context: %s", e)
+
+            def generate():
+                try:
+                    for text in stream_gemini_navigation_response(user_message, context, page_content, user_name):
+                        yield 'data: ' + json.dumps({'delta': text}) + '\n\n'
+                    yield 'data: ' + json.dumps({'done': True}) + '\n\n'
+                except Exception as e:
+                    logger.exception("Error streaming Gemini response: %s", e)
+                    yield 'data: ' + json.dumps({'error': str(e)}) + '\n\n'
+
+            return Response(generate(), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    @app.route('/api/health', methods=['GET'])
+    def health():
+        """Health check endpoint"""
+        bot = get_chatbot()
+        payload = {
+            'status': 'ok' if bot else 'error',
+            'chatbot_ready': bot is not None,
             'timestamp': datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        print(f"Error in chat endpoint: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-
-@app.route('/api/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    bot = get_chatbot()
-    return jsonify({
-        'status': 'ok' if bot else 'error',
-        'chatbot_ready': bot is not None,
-        'gemini_ready': gemini_model is not None,
-        'mode': 'gemini_enhanced',
-        'timestamp': datetime.now().isoformat()
-    })
-
-
-@app.route('/api/stats', methods=['GET'])
-def stats():
-    """Get chatbot statistics"""
-    bot = get_chatbot()
-    if not bot:
-        return jsonify({'error': 'Chatbot not ready'}), 500
-    
-    return jsonify({
-        'documents': bot.knowledge_base.vector_store.get_document_count(),
-        'conversations': len(bot.conversation_history),
-        'embedding_dimension': bot.embedding_generator.embedding_dimension,
-        'gemini_enabled': gemini_model is not None
-    })
+        }
+        if gemini_enabled:
+            payload['gemini_ready'] = gemini_model is not None
+            payload['mode'] = 'gemini_enhanced'
+        return jsonify(payload)
+
+    @app.route('/api/stats', methods=['GET'])
+    def stats():
+        """Get chatbot statistics"""
+        bot = get_chatbot()
+        if not bot:
+            return jsonify({'error': 'Chatbot not ready'}), 500
+
+        payload = {
+            'documents': bot.knowledge_base.vector_store.get_document_count(),
+            'conversations': len(bot.conversation_history),
+            'embedding_dimension': bot.embedding_generator.embedding_dimension
+        }
+        if gemini_enabled:
+            payload['gemini_enabled'] = gemini_model is not None
+        return jsonify(payload)
+
+    # Warm the local caches in the background (once per process) so the
+    # first real request doesn't pay the cold-start cost. Under gunicorn
+    # with preload_app this import runs in the master while workers fork,
+    # so gunicorn_conf sets WARM_CACHE_IN_WORKER and defers warming to
+    # each worker's post_worker_init hook instead
+    if os.path.exists(KB_PATH) and os.environ.get('WARM_CACHE_IN_WORKER') != '1':
+        warm_cache()
+
+    return app
+
+
+# Default module-level app keeps `gunicorn app_gemini:app` and the run
+# scripts working unchanged
+app = create_app(gemini_enabled=True)
 
 
 if __name__ == '__main__':
@@ -314,4 +924,4 @@ if __name__ == '__main__':
     print("="*60 + "\n")
     
     # Run Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000)
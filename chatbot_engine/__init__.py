@@ -0,0 +1 @@
+"""Chatbot Engine package"""
@@ -4,27 +4,194 @@ Core chatbot logic with intent recognition and response generation
 No external LLM APIs - completely local processing
 """
 
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from nlp_engine.text_processor import BilingualNLPEngine
-from nlp_engine.simple_embeddings import LocalEmbeddingGenerator
-# Conversational engine import - optional for more natural responses
-try:
-    from nlp_engine.conversational import get_conversational_engine
-    CONVERSATIONAL_AVAILABLE = True
-except ImportError:
-    CONVERSATIONAL_AVAILABLE = False
-from knowledge_base.vector_store import KnowledgeBase
+import random
+import re
 import sqlite3
 import json
-from typing import Dict, List
+from collections import deque
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Dict, List, Tuple
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keyword groups compiled once into single alternation regexes - one
+# C-level scan per check instead of a Python `any(word in text)` loop.
+# Substring semantics are kept (no \b) so Tamil words match as before.
+_FOLLOW_UP_RE = re.compile('|'.join(map(re.escape, (
+    'yes', 'yeah', 'ok', 'okay', 'sure', 'more', 'tell me more', 'what else',
+    'ஆம்', 'சரி', 'சொல்லுங்கள்', 'மேலும்', 'வேறு', 'அப்புறம்',
+    'and then', 'next', 'after that', 'பிறகு', 'அடுத்து'
+))))
+_VAGUE_RE = re.compile('|'.join(map(re.escape, (
+    'help', 'info', 'tell me', 'want to know', 'need',
+    'உதவி', 'தகவல்', 'தெரிந்து', 'தேவை'
+))))
+_SERVICE_MENTION_RE = re.compile('|'.join(map(re.escape, (
+    'birth', 'income', 'community', 'ration', 'certificate',
+    'பிறப்பு', 'வருமான', 'சமூக', 'ரேஷன்', 'சான்றிதழ்'
+))))
+
+# Bilingual response templates - immutable content shared by every
+# instance, read-only so templates can't be mutated by accident
+_RESPONSE_TEMPLATES = MappingProxyType({
+    'greeting': {
+        'en': "Hello! I'm here to help you with Tamil Nadu government services. How can I assist you today?",
+        'ta': "வணக்கம்! தமிழ்நாடு அரசு சேவைகள் தொடர்பாக நான் உங்களுக்கு உதவ இங்கே இருக்கிறேன். இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?"
+    },
+    'farewell': {
+        'en': "Thank you for using our service. Have a great day!",
+        'ta': "எங்கள் சேவையைப் பயன்படுத்தியதற்கு நன்றி. நல்ல நாள்!"
+    },
+    'clarification': {
+        'en': "I'm not sure I understand. Could you please rephrase your question?",
+        'ta': "எனக்கு புரியவில்லை. உங்கள் கேள்வியை வேறு விதமாக கேட்க முடியுமா?"
+    },
+    'no_results': {
+        'en': "I couldn't find specific information about that. Please try asking differently or contact the helpline: 1800-425-1000",
+        'ta': "அதைப் பற்றி குறிப்பிட்ட தகவல் எனக்கு கிடைக்கவில்லை. தயவுசெய்து வேறுவிதமாக கேளுங்கள் அல்லது உதவி எண்ணை தொடர்பு கொள்ளுங்கள்: 1800-425-1000"
+    }
+})
+
+# Conversational wrapper fragments for the no-engine fallback, shared by
+# all instances instead of being rebuilt per response
+_OPENINGS = {
+    'en': ("Sure! ", "I'd be happy to help! ", "Here's what you need to know: "),
+    'ta': ("நிச்சயமாக! ", "சரி! ", "நல்ல கேள்வி! "),
+}
+_CLOSINGS = {
+    'en': ("\n\nIs there anything else you'd like to know? 😊",
+           "\n\nFeel free to ask if you need more details!"),
+    'ta': ("\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊",
+           "\n\nமேலும் விவரங்கள் தேவையா?"),
+}
+
+# Per-intent response lines, built once at import and substituted with a
+# single str.format_map(service) per line - replaces the former if/elif
+# chain that rebuilt the same literal lists on every response. Intents
+# whose body iterates over service lists (documents, procedure, fees,
+# general_inquiry) are composed in _format_service_response instead.
+_INTENT_LINES = {
+    'download': {
+        'en': (
+            "💻 How to Download Online:",
+            "  1. Visit {url}",
+            "  2. Enter your application number and details",
+            "  3. Click 'Download' button",
+            "  4. Download PDF and print",
+            "",
+            "⚠️ Note: Only previously issued certificates can be downloaded",
+        ),
+        'ta': (
+            "💻 ஆன்லைனில் டவுன்லோட் செய்வது எப்படி:",
+            "  1. {url} வலைதளத்திற்கு செல்லவும்",
+            "  2. உங்கள் விண்ணப்ப எண் மற்றும் விவரங்களை உள்ளிடவும்",
+            "  3. 'பதிவிறக்கம்' பொத்தானை கிளிக் செய்யவும்",
+            "  4. PDF ஐப் பதிவிறக்கம் செய்து அச்சிடவும்",
+            "",
+            "⚠️ குறிப்பு: ஏற்கனவே வழங்கப்பட்ட சான்றிதழ்களை மட்டுமே டவுன்லோட் செய்ய முடியும்",
+        ),
+    },
+    'reissue': {
+        'en': (
+            "🔄 How to Get Duplicate Certificate:",
+            "  1. Visit nearest e-Sevai center or Taluk office",
+            "  2. Fill 'Duplicate Certificate' application",
+            "  3. Provide original certificate copy or number",
+            "  4. Submit ID proof",
+            "  5. Pay fees",
+            "",
+            "💰 Fees: {fees}",
+        ),
+        'ta': (
+            "🔄 நகல் சான்றிதழ் பெறுவது எப்படி:",
+            "  1. அருகிலுள்ள இ-சேவை மையம் அல்லது தாலுக்கா அலுவலகத்திற்கு செல்லவும்",
+            "  2. 'நகல் சான்றிதழ்' விண்ணப்பத்தைப் பூர்த்தி செய்யவும்",
+            "  3. அசல் சான்றிதழின் நகல் அல்லது எண்ணை வழங்கவும்",
+            "  4. அடையாள சான்று சமர்ப்பிக்கவும்",
+            "  5. கட்டணம் செலுத்தவும்",
+            "",
+            "💰 கட்டணம்: {fees_ta}",
+        ),
+    },
+    'correction': {
+        'en': (
+            "✏️ How to Make Corrections:",
+            "  1. Visit Taluk office with original certificate",
+            "  2. Fill 'Correction' application form",
+            "  3. Attach supporting documents for correction",
+            "  4. Corrected certificate issued after verification",
+        ),
+        'ta': (
+            "✏️ தவறுகளைத் திருத்துவது எப்படி:",
+            "  1. அசல் சான்றிதழுடன் தாலுக்கா அலுவலகத்திற்கு செல்லவும்",
+            "  2. 'திருத்தம்' விண்ணப்பத்தை பூர்த்தி செய்யவும்",
+            "  3. திருத்தத்திற்கான ஆதார ஆவணங்களை இணைக்கவும்",
+            "  4. சரிபார்ப்புக்குப் பிறகு திருத்தப்பட்ட சான்றிதழ் வழங்கப்படும்",
+        ),
+    },
+    'renewal': {
+        'en': (
+            "🔄 How to Renew:",
+            "  1. Apply at e-Sevai center or online",
+            "  2. Attach copy of original certificate",
+            "  3. Submit updated information/documents",
+            "  4. Pay renewal fees",
+        ),
+        'ta': (
+            "🔄 புதுப்பிப்பது எப்படி:",
+            "  1. இ-சேவை மையம் அல்லது ஆன்லைனில் விண்ணப்பிக்கவும்",
+            "  2. அசல் சான்றிதழின் நகலை இணைக்கவும்",
+            "  3. புதுப்பிக்கப்பட்ட தகவல்கள்/ஆவணங்களை சமர்ப்பிக்கவும்",
+            "  4. கட்டணம் செலுத்தவும்",
+        ),
+    },
+    'status': {
+        'en': (
+            "📊 How to Check Status:",
+            "  1. Go to 'Application Status' section on {url}",
+            "  2. Enter your application number",
+            "  3. Verify with mobile or Aadhaar number",
+            "  4. View current status",
+            "",
+            "📞 Status via SMS: Call {contact}",
+        ),
+        'ta': (
+            "📊 நிலையைச் சரிபார்ப்பது எப்படி:",
+            "  1. {url} இல் 'விண்ணப்ப நிலை' பிரிவுக்கு செல்லவும்",
+            "  2. உங்கள் விண்ணப்ப எண்ணை உள்ளிடவும்",
+            "  3. மொபைல் எண் அல்லது ஆதார் எண்ணைச் சரிபார்க்கவும்",
+            "  4. தற்போதைய நிலையைக் காணவும்",
+            "",
+            "📞 SMS வழி நிலை: {contact} க்கு அழைக்கவும்",
+        ),
+    },
+    'contact': {
+        'en': (
+            "📞 Contact Information:",
+            "  Helpline: {contact}",
+            "  Website: {url}",
+            "  Department: {department}",
+        ),
+        'ta': (
+            "📞 தொடர்பு தகவல்:",
+            "  உதவி எண்: {contact}",
+            "  வலைதளம்: {url}",
+            "  துறை: {department_ta}",
+        ),
+    },
+}
+
+# Each intent block pre-joined into one template string at import - a
+# single C-level format_map per response instead of per-line substitution
+_INTENT_TEMPLATES = {
+    intent: {lang: "\n".join(lines) for lang, lines in by_lang.items()}
+    for intent, by_lang in _INTENT_LINES.items()
+}
+
 
 class GovernmentChatbot:
     """
@@ -41,13 +208,26 @@ class GovernmentChatbot:
             db_path: Path to SQLite database
         """
         logger.info("Initializing Government Chatbot...")
-        
+
+        # Heavy NLP/embedding/vector-store imports are deferred to first
+        # construction: importing this module stays cheap for callers that
+        # never build a bot (unit tests, tooling), since these pull in
+        # NumPy/scikit-learn transitively
+        from nlp_engine.text_processor import BilingualNLPEngine
+        from nlp_engine.simple_embeddings import LocalEmbeddingGenerator
+        from knowledge_base.vector_store import KnowledgeBase
+        # Conversational engine import - optional for more natural responses
+        try:
+            from nlp_engine.conversational import get_conversational_engine
+        except ImportError:
+            get_conversational_engine = None
+
         # Load NLP components
         self.nlp_engine = BilingualNLPEngine()
         self.embedding_generator = LocalEmbeddingGenerator()
-        
+
         # Load conversational engine (makes responses more natural)
-        if CONVERSATIONAL_AVAILABLE:
+        if get_conversational_engine is not None:
             self.conversational_engine = get_conversational_engine(use_huggingface=False)
         else:
             self.conversational_engine = None
@@ -59,83 +239,80 @@ class GovernmentChatbot:
         
         if os.path.exists(knowledge_base_path):
             self.knowledge_base.load(knowledge_base_path)
-            logger.info(f"✓ Knowledge base loaded: {self.knowledge_base.vector_store.get_document_count()} documents")
+            logger.info("✓ Knowledge base loaded: %s documents", self.knowledge_base.vector_store.get_document_count())
         else:
-            logger.warning(f"Knowledge base not found at {knowledge_base_path}")
+            logger.warning("Knowledge base not found at %s", knowledge_base_path)
         
-        # Database connection
+        # Database connection - opened once and kept for the lifetime of the
+        # bot; per-turn connect/close was the dominant cost in chat() outside
+        # the embedding search. Reads only, so sharing across threads is safe.
         self.db_path = db_path
-        
-        # Conversation context
-        self.conversation_history = []
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # No journal-mode pragma here: chat() only reads, and flipping the
+        # shipped DB into WAL would litter -shm/-wal side-files at startup
+        self._db.execute('PRAGMA temp_store=MEMORY')
+        
+        # Conversation context - bounded so a long-running server doesn't
+        # keep every turn (and its analysis dict) alive forever; nothing
+        # reads back further than the last turn
+        self.conversation_history = deque(maxlen=100)
         self.last_service = None  # Track last discussed service
         self.user_context = {}  # Store user preferences and context
-        
-        # Response templates
-        self.response_templates = self._load_response_templates()
+        self._last_query_vec = None  # Embedding of the current turn's query
+        self._rng = random.Random()  # For conversational opening/closing picks
         
         logger.info("✓ Chatbot initialized successfully")
-    
-    def _load_response_templates(self) -> Dict:
-        """Load bilingual response templates"""
+
+
+    @lru_cache(maxsize=256)
+    def _service_details(self, service_id: str):
+        """
+        Fetch and fully build one service dict (memoized)
+        The JSON list columns are decoded exactly once per service - repeated
+        turns about the same service cost a dict lookup, no SQL and no parsing
+        """
+        row = self._db.execute(
+            'SELECT id, name_en, name_ta, description_en, description_ta, '
+            'department, department_ta, requirements, requirements_ta, '
+            'procedure, procedure_ta, fees, fees_ta, processing_time, '
+            'contact, url FROM services WHERE id = ?',
+            (service_id,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
         return {
-            'greeting': {
-                'en': "Hello! I'm here to help you with Tamil Nadu government services. How can I assist you today?",
-                'ta': "வணக்கம்! தமிழ்நாடு அரசு சேவைகள் தொடர்பாக நான் உங்களுக்கு உதவ இங்கே இருக்கிறேன். இன்று நான் உங்களுக்கு எப்படி உதவ முடியும்?"
-            },
-            'farewell': {
-                'en': "Thank you for using our service. Have a great day!",
-                'ta': "எங்கள் சேவையைப் பயன்படுத்தியதற்கு நன்றி. நல்ல நாள்!"
-            },
-            'clarification': {
-                'en': "I'm not sure I understand. Could you please rephrase your question?",
-                'ta': "எனக்கு புரியவில்லை. உங்கள் கேள்வியை வேறு விதமாக கேட்க முடியுமா?"
-            },
-            'no_results': {
-                'en': "I couldn't find specific information about that. Please try asking differently or contact the helpline: 1800-425-1000",
-                'ta': "அதைப் பற்றி குறிப்பிட்ட தகவல் எனக்கு கிடைக்கவில்லை. தயவுசெய்து வேறுவிதமாக கேளுங்கள் அல்லது உதவி எண்ணை தொடர்பு கொள்ளுங்கள்: 1800-425-1000"
-            }
+            'id': row['id'],
+            'name_en': row['name_en'],
+            'name_ta': row['name_ta'],
+            'description_en': row['description_en'],
+            'description_ta': row['description_ta'],
+            'department': row['department'],
+            'department_ta': row['department_ta'],
+            'requirements': json.loads(row['requirements']) if row['requirements'] else [],
+            'requirements_ta': json.loads(row['requirements_ta']) if row['requirements_ta'] else [],
+            'procedure': json.loads(row['procedure']) if row['procedure'] else [],
+            'procedure_ta': json.loads(row['procedure_ta']) if row['procedure_ta'] else [],
+            'fees': row['fees'],
+            'fees_ta': row['fees_ta'],
+            'processing_time': row['processing_time'],
+            'contact': row['contact'],
+            'url': row['url']
         }
-    
+
     def get_service_details(self, service_id: str) -> Dict:
         """Get detailed service information from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM services WHERE id = ?', (service_id,))
-        row = cursor.fetchone()
-        
-        conn.close()
-        
-        if row:
-            return {
-                'id': row[0],
-                'name_en': row[1],
-                'name_ta': row[2],
-                'description_en': row[3],
-                'description_ta': row[4],
-                'department': row[5],
-                'department_ta': row[6],
-                'requirements': json.loads(row[7]) if row[7] else [],
-                'requirements_ta': json.loads(row[8]) if row[8] else [],
-                'procedure': json.loads(row[9]) if row[9] else [],
-                'procedure_ta': json.loads(row[10]) if row[10] else [],
-                'fees': row[11],
-                'fees_ta': row[12],
-                'processing_time': row[13],
-                'contact': row[14],
-                'url': row[15]
-            }
-        
-        return None
+        return self._service_details(service_id)
     
-    def generate_response(self, query_analysis: Dict, search_results: List[Dict]) -> Dict:
+    def generate_response(self, query_analysis: Dict, search_results: List) -> Dict:
         """
         Generate appropriate response based on query analysis and search results
-        
+
         Args:
             query_analysis: Analyzed query from NLP engine
-            search_results: Retrieved documents from knowledge base
+            search_results: ServiceDoc results from the knowledge base
             
         Returns:
             Response dictionary with text and metadata
@@ -143,46 +320,27 @@ class GovernmentChatbot:
         language = query_analysis['language']
         intent = query_analysis['intent']
         service_type = query_analysis['service_type']
-        original_text = query_analysis['original_text'].lower()
-        
-        # Handle greetings
-        if self.nlp_engine.is_greeting(query_analysis['original_text']):
-            return {
-                'text': self.response_templates['greeting']['ta' if language == 'tamil' else 'en'],
-                'type': 'greeting',
-                'language': language
-            }
-        
-        # Handle farewells
-        if self.nlp_engine.is_farewell(query_analysis['original_text']):
-            return {
-                'text': self.response_templates['farewell']['ta' if language == 'tamil' else 'en'],
-                'type': 'farewell',
-                'language': language
-            }
-        
-        # Handle follow-up questions (yes/no/more/tell me more)
-        if self._is_follow_up(original_text):
-            return self._handle_follow_up(language, intent)
-        
-        # Handle vague or unclear queries - ask clarifying questions
-        if self._is_vague_query(original_text):
-            return self._ask_clarification(language, original_text)
-        
+
+        # Greetings/farewells/follow-ups/vague queries (normally already
+        # served before retrieval in _process_message)
+        template_response = self._template_response(query_analysis)
+        if template_response is not None:
+            return template_response
+
         # No results found
-        if not search_results or search_results[0]['similarity_score'] < 0.5:
+        if not search_results or search_results[0].similarity_score < 0.5:
             return self._handle_no_results(language, service_type)
-        
+
         # Get most relevant result
         top_result = search_results[0]
-        service_id = top_result.get('id')
+        service_id = top_result.id
         
         # Get detailed information
         service_details = self.get_service_details(service_id)
         
         if not service_details:
             return {
-                'text': self.response_templates['no_results']['ta' if language == 'tamil' else 'en'],
+                'text': _RESPONSE_TEMPLATES['no_results']['ta' if language == 'tamil' else 'en'],
                 'type': 'no_results',
                 'language': language
             }
@@ -192,7 +350,45 @@ class GovernmentChatbot:
         
         # Generate intent-specific response
         return self._format_service_response(service_details, intent, language)
-    
+
+    def _template_response(self, query_analysis: Dict) -> Dict:
+        """
+        Serve greetings, farewells, follow-ups and vague queries straight
+        from templates; returns None when the query actually needs retrieval
+        """
+        language = query_analysis['language']
+        # Lowercase once and reuse - .lower() over Tamil text walks and
+        # normalizes every character, and all four checks below accept
+        # already-lowercased input
+        original_text = query_analysis['original_text'].lower()
+
+        # Handle greetings
+        if self.nlp_engine.is_greeting(original_text):
+            return {
+                'text': _RESPONSE_TEMPLATES['greeting']['ta' if language == 'tamil' else 'en'],
+                'type': 'greeting',
+                'language': language
+            }
+
+        # Handle farewells
+        if self.nlp_engine.is_farewell(original_text):
+            return {
+                'text': _RESPONSE_TEMPLATES['farewell']['ta' if language == 'tamil' else 'en'],
+                'type': 'farewell',
+                'language': language
+            }
+
+        # Handle follow-up questions (yes/no/more/tell me more)
+        if self._is_follow_up(original_text):
+            return self._handle_follow_up(language, query_analysis['intent'])
+
+        # Handle vague or unclear queries - ask clarifying questions
+        if self._is_vague_query(original_text):
+            return self._ask_clarification(language, original_text)
+
+        return None
+
+
     def _format_service_response(self, service: Dict, intent: str, language: str) -> Dict:
         """Format service information based on intent"""
         
@@ -202,174 +398,43 @@ class GovernmentChatbot:
         service_name = service['name_ta'] if is_tamil else service['name_en']
         description = service['description_ta'] if is_tamil else service['description_en']
         
-        response_parts = []
-        
-        # Always include service name
-        response_parts.append(f"📋 {service_name}")
-        response_parts.append("")
-        
-        # Intent-specific information (tailored to user's actual request)
-        if intent == 'download':
-            if is_tamil:
-                response_parts.append("💻 ஆன்லைனில் டவுன்லோட் செய்வது எப்படி:")
-                response_parts.append("  1. {0} வலைதளத்திற்கு செல்லவும்".format(service['url']))
-                response_parts.append("  2. உங்கள் விண்ணப்ப எண் மற்றும் விவரங்களை உள்ளிடவும்")
-                response_parts.append("  3. 'பதிவிறக்கம்' பொத்தானை கிளிக் செய்யவும்")
-                response_parts.append("  4. PDF ஐப் பதிவிறக்கம் செய்து அச்சிடவும்")
-                response_parts.append("")
-                response_parts.append("⚠️ குறிப்பு: ஏற்கனவே வழங்கப்பட்ட சான்றிதழ்களை மட்டுமே டவுன்லோட் செய்ய முடியும்")
-            else:
-                response_parts.append("💻 How to Download Online:")
-                response_parts.append("  1. Visit {0}".format(service['url']))
-                response_parts.append("  2. Enter your application number and details")
-                response_parts.append("  3. Click 'Download' button")
-                response_parts.append("  4. Download PDF and print")
-                response_parts.append("")
-                response_parts.append("⚠️ Note: Only previously issued certificates can be downloaded")
-        
-        elif intent == 'reissue':
-            if is_tamil:
-                response_parts.append("🔄 நகல் சான்றிதழ் பெறுவது எப்படி:")
-                response_parts.append("  1. அருகிலுள்ள இ-சேவை மையம் அல்லது தாலுக்கா அலுவலகத்திற்கு செல்லவும்")
-                response_parts.append("  2. 'நகல் சான்றிதழ்' விண்ணப்பத்தைப் பூர்த்தி செய்யவும்")
-                response_parts.append("  3. அசல் சான்றிதழின் நகல் அல்லது எண்ணை வழங்கவும்")
-                response_parts.append("  4. அடையாள சான்று சமர்ப்பிக்கவும்")
-                response_parts.append("  5. கட்டணம் செலுத்தவும்")
-                response_parts.append("")
-                response_parts.append(f"💰 கட்டணம்: {service.get('fees_ta', 'தகவல் இல்லை')}")
-            else:
-                response_parts.append("🔄 How to Get Duplicate Certificate:")
-                response_parts.append("  1. Visit nearest e-Sevai center or Taluk office")
-                response_parts.append("  2. Fill 'Duplicate Certificate' application")
-                response_parts.append("  3. Provide original certificate copy or number")
-                response_parts.append("  4. Submit ID proof")
-                response_parts.append("  5. Pay fees")
-                response_parts.append("")
-                response_parts.append(f"💰 Fees: {service.get('fees', 'Not specified')}")
-        
-        elif intent == 'correction':
-            if is_tamil:
-                response_parts.append("✏️ தவறுகளைத் திருத்துவது எப்படி:")
-                response_parts.append("  1. அசல் சான்றிதழுடன் தாலுக்கா அலுவலகத்திற்கு செல்லவும்")
-                response_parts.append("  2. 'திருத்தம்' விண்ணப்பத்தை பூர்த்தி செய்யவும்")
-                response_parts.append("  3. திருத்தத்திற்கான ஆதார ஆவணங்களை இணைக்கவும்")
-                response_parts.append("  4. சரிபார்ப்புக்குப் பிறகு திருத்தப்பட்ட சான்றிதழ் வழங்கப்படும்")
-            else:
-                response_parts.append("✏️ How to Make Corrections:")
-                response_parts.append("  1. Visit Taluk office with original certificate")
-                response_parts.append("  2. Fill 'Correction' application form")
-                response_parts.append("  3. Attach supporting documents for correction")
-                response_parts.append("  4. Corrected certificate issued after verification")
-        
-        elif intent == 'renewal':
-            if is_tamil:
-                response_parts.append("🔄 புதுப்பிப்பது எப்படி:")
-                response_parts.append("  1. இ-சேவை மையம் அல்லது ஆன்லைனில் விண்ணப்பிக்கவும்")
-                response_parts.append("  2. அசல் சான்றிதழின் நகலை இணைக்கவும்")
-                response_parts.append("  3. புதுப்பிக்கப்பட்ட தகவல்கள்/ஆவணங்களை சமர்ப்பிக்கவும்")
-                response_parts.append("  4. கட்டணம் செலுத்தவும்")
-            else:
-                response_parts.append("🔄 How to Renew:")
-                response_parts.append("  1. Apply at e-Sevai center or online")
-                response_parts.append("  2. Attach copy of original certificate")
-                response_parts.append("  3. Submit updated information/documents")
-                response_parts.append("  4. Pay renewal fees")
-        
-        elif intent == 'status':
-            if is_tamil:
-                response_parts.append("📊 நிலையைச் சரிபார்ப்பது எப்படி:")
-                response_parts.append("  1. {0} இல் 'விண்ணப்ப நிலை' பிரிவுக்கு செல்லவும்".format(service['url']))
-                response_parts.append("  2. உங்கள் விண்ணப்ப எண்ணை உள்ளிடவும்")
-                response_parts.append("  3. மொபைல் எண் அல்லது ஆதார் எண்ணைச் சரிபார்க்கவும்")
-                response_parts.append("  4. தற்போதைய நிலையைக் காணவும்")
-                response_parts.append("")
-                response_parts.append(f"📞 SMS வழி நிலை: {service['contact']} க்கு அழைக்கவும்")
-            else:
-                response_parts.append("📊 How to Check Status:")
-                response_parts.append("  1. Go to 'Application Status' section on {0}".format(service['url']))
-                response_parts.append("  2. Enter your application number")
-                response_parts.append("  3. Verify with mobile or Aadhaar number")
-                response_parts.append("  4. View current status")
-                response_parts.append("")
-                response_parts.append(f"📞 Status via SMS: Call {service['contact']}")
-        
+        lang = 'ta' if is_tamil else 'en'
+
+        # Build multi-line sections and join them with blank lines at the
+        # end - no append("") spacer idiom, and the always-at-end contact
+        # footer composes trivially. The header is the service name.
+        sections = [f"📋 {service_name}"]
+
+        # Intent-specific information (tailored to user's actual request):
+        # fixed-shape intents are one pre-joined template and a single
+        # format_map call; the list-driven ones are composed from the
+        # service data below
+        static_template = _INTENT_TEMPLATES.get(intent)
+        if static_template is not None:
+            sections.append(static_template[lang].format_map(service))
+
         elif intent == 'documents':
-            if is_tamil:
-                response_parts.append("📑 தேவையான ஆவணங்கள்:")
-                for req in service['requirements_ta']:
-                    response_parts.append(f"  • {req}")
-            else:
-                response_parts.append("📑 Required Documents:")
-                for req in service['requirements']:
-                    response_parts.append(f"  • {req}")
-        
+            sections.append(self._documents_section(service, is_tamil))
+
         elif intent == 'apply' or intent == 'procedure':
-            if is_tamil:
-                response_parts.append("📝 விண்ணப்பிக்கும் முறை:")
-                for i, step in enumerate(service['procedure_ta'], 1):
-                    response_parts.append(f"  {i}. {step}")
-            else:
-                response_parts.append("📝 Application Procedure:")
-                for i, step in enumerate(service['procedure'], 1):
-                    response_parts.append(f"  {i}. {step}")
-        
+            sections.append(self._procedure_section(service, is_tamil))
+
         elif intent == 'fees':
-            fees = service['fees_ta'] if is_tamil else service['fees']
-            fees_label = "கட்டணம்" if is_tamil else "Fees"
-            response_parts.append(f"💰 {fees_label}: {fees}")
-            if service.get('processing_time'):
-                time_label = "செயலாக்க நேரம்" if is_tamil else "Processing Time"
-                response_parts.append(f"⏱️ {time_label}: {service['processing_time']}")
-        
-        elif intent == 'contact':
-            if is_tamil:
-                response_parts.append("📞 தொடர்பு தகவல்:")
-                response_parts.append(f"  உதவி எண்: {service['contact']}")
-                response_parts.append(f"  வலைதளம்: {service['url']}")
-                response_parts.append(f"  துறை: {service.get('department_ta', '')}")
-            else:
-                response_parts.append("📞 Contact Information:")
-                response_parts.append(f"  Helpline: {service['contact']}")
-                response_parts.append(f"  Website: {service['url']}")
-                response_parts.append(f"  Department: {service.get('department', '')}")
-        
+            sections.append(self._fees_section(service, is_tamil))
+
         else:  # general_inquiry or eligibility
-            response_parts.append(description)
-            response_parts.append("")
-            if is_tamil:
-                response_parts.append("📑 தேவையான ஆவணங்கள்:")
-                for req in service['requirements_ta']:
-                    response_parts.append(f"  • {req}")
-                response_parts.append("")
-                response_parts.append("📝 விண்ணப்பிக்கும் முறை:")
-                for i, step in enumerate(service['procedure_ta'], 1):
-                    response_parts.append(f"  {i}. {step}")
-            else:
-                response_parts.append("📑 Required Documents:")
-                for req in service['requirements']:
-                    response_parts.append(f"  • {req}")
-                response_parts.append("")
-                response_parts.append("📝 Application Procedure:")
-                for i, step in enumerate(service['procedure'], 1):
-                    response_parts.append(f"  {i}. {step}")
-            response_parts.append("")
-            fees = service['fees_ta'] if is_tamil else service['fees']
-            fees_label = "கட்டணம்" if is_tamil else "Fees"
-            response_parts.append(f"💰 {fees_label}: {fees}")
-            if service.get('processing_time'):
-                time_label = "செயலாக்க நேரம்" if is_tamil else "Processing Time"
-                response_parts.append(f"⏱️ {time_label}: {service['processing_time']}")
-        
+            sections.append(description)
+            sections.append(self._documents_section(service, is_tamil))
+            sections.append(self._procedure_section(service, is_tamil))
+            sections.append(self._fees_section(service, is_tamil))
+
         # Contact information (always at end)
-        response_parts.append("")
         if is_tamil:
-            response_parts.append(f"📞 தொடர்பு: {service['contact']}")
-            response_parts.append(f"🌐 வலைதளம்: {service['url']}")
+            sections.append(f"📞 தொடர்பு: {service['contact']}\n🌐 வலைதளம்: {service['url']}")
         else:
-            response_parts.append(f"📞 Contact: {service['contact']}")
-            response_parts.append(f"🌐 Website: {service['url']}")
-        
-        factual_response = '\n'.join(response_parts)
+            sections.append(f"📞 Contact: {service['contact']}\n🌐 Website: {service['url']}")
+
+        factual_response = '\n\n'.join(sections)
         
         # Make it more conversational if available
         if self.conversational_engine:
@@ -377,15 +442,11 @@ class GovernmentChatbot:
                 "", factual_response, language
             )
         else:
-            # Simple wrapper without conversational engine
-            import random
-            if language == 'tamil' or any(ord(c) >= 0x0B80 and ord(c) <= 0x0BFF for c in response_parts[0]):
-                openings = ["நிச்சயமாக! ", "சரி! ", "நல்ல கேள்வி! "]
-                closings = ["\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊", "\n\nமேலும் விவரங்கள் தேவையா?"]
-            else:
-                openings = ["Sure! ", "I'd be happy to help! ", "Here's what you need to know: "]
-                closings = ["\n\nIs there anything else you'd like to know? 😊", "\n\nFeel free to ask if you need more details!"]
-            conversational_response = random.choice(openings) + factual_response + random.choice(closings)
+            # Simple wrapper without conversational engine - the language
+            # already tells us the script, no need to rescan the text
+            conversational_response = (self._rng.choice(_OPENINGS[lang])
+                                       + factual_response
+                                       + self._rng.choice(_CLOSINGS[lang]))
         
         return {
             'text': conversational_response,
@@ -395,29 +456,51 @@ class GovernmentChatbot:
             'service_name': service_name
         }
     
+    @staticmethod
+    def _documents_section(service: Dict, is_tamil: bool) -> str:
+        """Required-documents block for the service"""
+        if is_tamil:
+            header = "📑 தேவையான ஆவணங்கள்:"
+            reqs = service['requirements_ta']
+        else:
+            header = "📑 Required Documents:"
+            reqs = service['requirements']
+        return "\n".join([header, *(f"  • {req}" for req in reqs)])
+
+    @staticmethod
+    def _procedure_section(service: Dict, is_tamil: bool) -> str:
+        """Numbered application-procedure block for the service"""
+        if is_tamil:
+            header = "📝 விண்ணப்பிக்கும் முறை:"
+            steps = service['procedure_ta']
+        else:
+            header = "📝 Application Procedure:"
+            steps = service['procedure']
+        return "\n".join([header, *(f"  {i}. {step}" for i, step in enumerate(steps, 1))])
+
+    @staticmethod
+    def _fees_section(service: Dict, is_tamil: bool) -> str:
+        """Fees (and processing time, when known) block for the service"""
+        if is_tamil:
+            section = f"💰 கட்டணம்: {service['fees_ta']}"
+            if service.get('processing_time'):
+                section += f"\n⏱️ செயலாக்க நேரம்: {service['processing_time']}"
+        else:
+            section = f"💰 Fees: {service['fees']}"
+            if service.get('processing_time'):
+                section += f"\n⏱️ Processing Time: {service['processing_time']}"
+        return section
+
     def _is_follow_up(self, text: str) -> bool:
-        """Check if message is a follow-up question"""
-        follow_up_words = [
-            'yes', 'yeah', 'ok', 'okay', 'sure', 'more', 'tell me more', 'what else',
-            'ஆம்', 'சரி', 'சொல்லுங்கள்', 'மேலும்', 'வேறு', 'அப்புறம்',
-            'and then', 'next', 'after that', 'பிறகு', 'அடுத்து'
-        ]
-        return any(word in text.lower() for word in follow_up_words) and len(text.split()) < 5
-    
+        """Check if message is a follow-up question (expects lowercased text)"""
+        return _FOLLOW_UP_RE.search(text) is not None and len(text.split()) < 5
+
     def _is_vague_query(self, text: str) -> bool:
-        """Check if query is too vague"""
-        vague_patterns = [
-            'help', 'info', 'tell me', 'want to know', 'need',
-            'உதவி', 'தகவல்', 'தெரிந்து', 'தேவை'
-        ]
+        """Check if query is too vague (expects lowercased text)"""
         # Vague if it's short and contains vague words but no specific service
-        is_short = len(text.split()) < 4
-        has_vague_word = any(word in text.lower() for word in vague_patterns)
-        has_no_service = not any(service in text.lower() for service in [
-            'birth', 'income', 'community', 'ration', 'certificate',
-            'பிறப்பு', 'வருமான', 'சமூக', 'ரேஷன்', 'சான்றிதழ்'
-        ])
-        return is_short and has_vague_word and has_no_service
+        return (len(text.split()) < 4
+                and _VAGUE_RE.search(text) is not None
+                and _SERVICE_MENTION_RE.search(text) is None)
     
     def _ask_clarification(self, language: str, original_text: str) -> Dict:
         """Ask clarifying questions for vague queries"""
@@ -471,28 +554,22 @@ You can click one of the quick replies below or tell me more about what you need
         is_tamil = language == 'tamil'
         
         if intent == 'procedure' or 'how' in intent:
-            # Give detailed step-by-step procedure
-            response_parts = []
+            # Give detailed step-by-step procedure: one join over the steps
+            # and a single concatenation instead of per-line appends
             if is_tamil:
-                response_parts.append(f"நிச்சயமாக! {service['name_ta']} க்கான விரிவான செயல்முறை:")
-                response_parts.append("\n📝 படிப்படியான வழிமுறைகள்:")
-                for i, step in enumerate(service['procedure_ta'], 1):
-                    response_parts.append(f"\n{i}. {step}")
+                header = f"நிச்சயமாக! {service['name_ta']} க்கான விரிவான செயல்முறை:\n\n📝 படிப்படியான வழிமுறைகள்:"
+                steps = service['procedure_ta']
+                footer = "\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊"
             else:
-                response_parts.append(f"Sure! Here's the detailed procedure for {service['name_en']}:")
-                response_parts.append("\n📝 Step-by-step process:")
-                for i, step in enumerate(service['procedure'], 1):
-                    response_parts.append(f"\n{i}. {step}")
+                header = f"Sure! Here's the detailed procedure for {service['name_en']}:\n\n📝 Step-by-step process:"
+                steps = service['procedure']
+                footer = "\n\nWould you like to know anything else? 😊"
+            body = "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+            response_text = f"{header}\n{body}{footer}"
         else:
             # Give complete information
             return self._format_service_response(service, 'general_inquiry', language)
-        
-        response_text = ''.join(response_parts)
-        if is_tamil:
-            response_text += "\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊"
-        else:
-            response_text += "\n\nWould you like to know anything else? 😊"
-        
+
         return {
             'text': response_text,
             'type': 'follow_up',
@@ -534,41 +611,68 @@ Helpline: 1800-425-1000"""
             'language': language
         }
     
+    def _process_message(self, user_message: str) -> Tuple[Dict, Dict]:
+        """Analyze a message, search the knowledge base and generate a response"""
+        logger.info("User: %s", user_message)
+
+        # Analyze query
+        query_analysis = self.nlp_engine.analyze_query(user_message)
+        logger.info("Analysis: %s | %s | %s", query_analysis['intent'], query_analysis['service_type'], query_analysis['language'])
+
+        # Greetings, farewells, follow-ups and vague queries are served from
+        # templates - skip the embedding + vector search entirely for them
+        response = self._template_response(query_analysis)
+        if response is None:
+            # Embed the message once and keep the vector for the turn, so
+            # search and any downstream similarity logic share one encode
+            query_vector = self.embedding_generator.generate_embedding(user_message)
+            self._last_query_vec = query_vector
+
+            # Search knowledge base
+            search_results = self.knowledge_base.search_by_vector(query_vector, k=3)
+
+            # Generate response
+            response = self.generate_response(query_analysis, search_results)
+
+        logger.info("Bot: %s", response['type'])
+
+        return response, query_analysis
+
+    def answer(self, user_message: str) -> Dict:
+        """
+        Generate a response without recording the turn in conversation history
+
+        Safe to call from caching layers where the same message may be
+        served many times.
+
+        Args:
+            user_message: User's input message
+
+        Returns:
+            Response dictionary with text and metadata
+        """
+        response, _ = self._process_message(user_message)
+        return response
+
     def chat(self, user_message: str) -> Dict:
         """
         Process user message and generate response
-        
+
         Args:
             user_message: User's input message
-            
+
         Returns:
             Response dictionary with text and metadata
         """
-        logger.info(f"User: {user_message}")
-        
-        # Analyze query
-        query_analysis = self.nlp_engine.analyze_query(user_message)
-        logger.info(f"Analysis: {query_analysis['intent']} | {query_analysis['service_type']} | {query_analysis['language']}")
-        
-        # Search knowledge base
-        search_results = self.knowledge_base.search(
-            user_message,
-            self.embedding_generator,
-            k=3
-        )
-        
-        # Generate response
-        response = self.generate_response(query_analysis, search_results)
-        
+        response, query_analysis = self._process_message(user_message)
+
         # Save to conversation history
         self.conversation_history.append({
             'user': user_message,
             'bot': response['text'],
             'analysis': query_analysis
         })
-        
-        logger.info(f"Bot: {response['type']}")
-        
+
         return response
 
 
@@ -0,0 +1 @@
+"""Data Collection package"""
@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for the Government Services Chatbot
+Gevent workers let each worker service many concurrent slow Gemini calls
+(30s timeouts) instead of blocking one request at a time
+
+Run with: gunicorn -c gunicorn_conf.py app_gemini:app
+"""
+
+import multiprocessing
+import os
+
+# With preload_app the app module is imported in the master while workers
+# fork; starting the warm thread there can fork children mid-lock (logging,
+# lru_cache) and its once-only guard would then stop workers from warming
+# themselves. Flag the app to skip import-time warming; each worker warms
+# itself in post_worker_init below.
+os.environ['WARM_CACHE_IN_WORKER'] = '1'
+
+bind = '0.0.0.0:5000'
+# Load the app (and the embedding model / knowledge base) once in the master;
+# forked workers share those pages copy-on-write instead of re-loading
+preload_app = True
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+timeout = 60
+keepalive = 5
+
+
+def post_worker_init(worker):
+    """Warm each worker's caches after the fork, not in the master"""
+    import app_gemini
+    app_gemini.warm_cache()
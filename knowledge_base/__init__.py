@@ -0,0 +1 @@
+"""Knowledge Base package"""
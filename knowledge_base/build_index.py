@@ -88,8 +88,8 @@ def test_search():
         
         print("\nTop results:")
         for i, result in enumerate(results, 1):
-            print(f"  {i}. {result.get('name_en', 'N/A')} / {result.get('name_ta', 'N/A')}")
-            print(f"     Score: {result['similarity_score']:.3f}")
+            print(f"  {i}. {result.name_en or 'N/A'} / {result.name_ta or 'N/A'}")
+            print(f"     Score: {result.similarity_score:.3f}")
     
     print("\n" + "="*60)
 
@@ -0,0 +1,30 @@
+"""
+Result Types
+Slotted containers for knowledge base search results
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass(slots=True)
+class ServiceDoc:
+    """
+    One knowledge base hit
+
+    Slots instead of a per-result dict: attribute access is a fixed
+    offset, the instance is noticeably smaller, and high-QPS search
+    stops churning dict allocations
+    """
+    id: Optional[str] = None
+    name_en: Optional[str] = None
+    name_ta: Optional[str] = None
+    description_en: Optional[str] = None
+    description_ta: Optional[str] = None
+    department: Optional[str] = None
+    type: str = 'service'
+    similarity_score: float = 0.0
+
+
+# Known field names, for filtering stray keys out of legacy stores
+SERVICE_DOC_FIELDS = frozenset(f.name for f in fields(ServiceDoc))
@@ -3,36 +3,184 @@ Simple Vector Store using NumPy
 Local vector database for semantic search - Lightweight version
 """
 
+import hashlib
 import numpy as np
 import pickle
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 import logging
 
+try:
+    from knowledge_base.result_types import ServiceDoc, SERVICE_DOC_FIELDS
+except ImportError:
+    # Running as a loose script without the repo root on sys.path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from knowledge_base.result_types import ServiceDoc, SERVICE_DOC_FIELDS
+
+# Numba JIT - optional, for a parallel similarity kernel over large stores
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# hnswlib - optional, for O(log N) approximate search instead of the
+# linear scan once the store grows past a few thousand documents
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# msgpack - optional, C-extension decoding for the documents store; much
+# faster than pickle and doesn't repeat every dict key per document
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# int8 first-pass retrieval: only worth the quantization detour once the
+# store is big enough for memory bandwidth to matter
+_QUANT_MIN_DOCS = 256
+# How many candidates the int8 pass hands to the exact FP32 rerank
+_RERANK_POOL = 32
+# Batch size per thread when embedding during a knowledge-base rebuild
+_EMBED_CHUNK = 32
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores_numba(query, mat):
+        """Dot products of the unit query against every unit row of mat (float32)"""
+        n, d = mat.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            dot = 0.0
+            for j in range(d):
+                dot += mat[i, j] * query[j]
+            scores[i] = dot
+        return scores
+
 
 class SimpleVectorStore:
     """
     Simple NumPy-based vector store for similarity search
     Lightweight alternative to FAISS
+
+    Dtype contract: embeddings are held as contiguous float32 everywhere -
+    inserts cast on the way in, load() converts legacy float64 files, and
+    queries are cast once per search. Half the memory of float64 and full
+    SIMD lane width in the BLAS scan; don't widen it back
     """
     
     def __init__(self, dimension: int = 768, index_type: str = 'flat'):
         """
         Initialize simple vector store
-        
+
         Args:
             dimension: Embedding dimension
-            index_type: Kept for compatibility (always uses simple search)
+            index_type: 'flat' for the exact linear scan, 'hnsw' for an
+                approximate hnswlib graph index (falls back to the scan
+                when hnswlib isn't installed)
         """
         self.dimension = dimension
-        self.index_type = 'simple'
-        self.documents: List[Dict] = []
+        # Documents in columnar (struct-of-arrays) form: one list per field
+        # instead of one dict per document, so each key string exists once
+        # and the per-column lists serialize compactly; _row() materializes
+        # a dict on demand for search results
+        self._columns: Dict[str, List] = {}
+        self._doc_count = 0
+        # Backing matrix, filled row-by-row up to _n_used; reserve() sizes
+        # it up front so inserts are slice writes instead of vstack copies
         self.embeddings: np.ndarray = None
-        
+        self._n_used = 0
+        # Transposed (D, N) copy of the embeddings, rebuilt whenever the
+        # store changes - the per-query matrix-vector product then runs over
+        # a layout where each feature's values are contiguous (SIMD-friendly)
+        self._mat_soa: np.ndarray = None
+        self._hnsw = None
+
+        if index_type == 'hnsw' and HNSWLIB_AVAILABLE:
+            self.index_type = 'hnsw'
+            self._hnsw = hnswlib.Index(space='cosine', dim=dimension)
+            self._hnsw.init_index(max_elements=1024, ef_construction=200, M=16)
+        else:
+            if index_type == 'hnsw':
+                logger.warning("hnswlib not installed - falling back to linear scan")
+            self.index_type = 'simple'
+
         logger.info(f"Simple vector store created: dimension: {dimension}")
+
+    def reserve(self, n: int):
+        """
+        Pre-allocate capacity for n embeddings so subsequent add_documents
+        calls fill slices of one buffer instead of re-copying via vstack
+
+        Growth doubles capacity, so M appends move O(N) bytes in total;
+        load() memory-maps the saved file, so the buffer only turns into
+        a resident copy once something actually appends to it
+        """
+        if self.embeddings is None:
+            self.embeddings = np.empty((n, self.dimension), dtype=np.float32)
+            return
+        # A store loaded via mmap is read-only; materialize it the first
+        # time new rows need to be written
+        if n > len(self.embeddings) or not self.embeddings.flags.writeable:
+            grown = np.empty((max(n, len(self.embeddings)), self.dimension), dtype=np.float32)
+            grown[:self._n_used] = self.embeddings[:self._n_used]
+            self.embeddings = grown
+
+    def _row(self, idx: int) -> Dict:
+        """Materialize one document dict from the column store"""
+        return {key: col[idx] for key, col in self._columns.items()}
+
+    def _extend_columns(self, documents: List[Dict]):
+        """Append a batch of document dicts to the per-field column lists"""
+        for doc in documents:
+            for key in doc:
+                if key not in self._columns:
+                    # New field mid-stream: backfill earlier rows with None
+                    self._columns[key] = [None] * self._doc_count
+        for key, col in self._columns.items():
+            col.extend(doc.get(key) for doc in documents)
+        self._doc_count += len(documents)
+
+    def _used_embeddings(self):
+        """The filled rows of the backing matrix (what scoring operates on)"""
+        if self.embeddings is None:
+            return None
+        return self.embeddings[:self._n_used]
+
+    def _refresh_layout(self):
+        """Rebuild the derived scoring matrices after the store changed"""
+        if self.embeddings is None or self._n_used == 0:
+            self._emb_norm = None
+            self._mat_soa = None
+            self._q_mat = None
+            self._q_scale = None
+            return
+
+        # Row-normalize once at insert/load time - cosine similarity then
+        # collapses to a single GEMV against the unit query, with no norms
+        # recomputed per request
+        used = self._used_embeddings()
+        norms = np.linalg.norm(used, axis=1, keepdims=True)
+        self._emb_norm = used / np.maximum(norms, 1e-10)
+        self._mat_soa = np.ascontiguousarray(self._emb_norm.T)
+
+        # int8 quantization with a per-row scale: the first retrieval pass
+        # reads a quarter of the FP32 bytes, and the exact FP32 math only
+        # runs on the small rerank pool
+        scale = np.max(np.abs(self._emb_norm), axis=1, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        self._q_mat = np.round(self._emb_norm / scale).astype(np.int8)
+        self._q_scale = scale[:, 0].astype(np.float32)
     
     def add_documents(self, embeddings: np.ndarray, documents: List[Dict]):
         """
@@ -44,58 +192,142 @@ class SimpleVectorStore:
         """
         if len(embeddings) != len(documents):
             raise ValueError("Number of embeddings must match number of documents")
-        
-        # Store embeddings
-        if self.embeddings is None:
-            self.embeddings = embeddings
-        else:
-            self.embeddings = np.vstack([self.embeddings, embeddings])
-        
-        self.documents.extend(documents)
-        
-        logger.info(f"Added {len(documents)} documents. Total: {len(self.documents)}")
+
+        # Store embeddings as one contiguous float32 matrix - the scoring,
+        # transpose and quantization paths all assume this layout and never
+        # have to copy or upcast per query
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        needed = self._n_used + len(embeddings)
+        if self.embeddings is None or needed > len(self.embeddings):
+            # Caller didn't reserve() enough - grow with headroom so a run
+            # of small adds still moves O(N) bytes overall, not O(N^2)
+            self.reserve(max(needed, self._n_used * 2))
+        self.embeddings[self._n_used:needed] = embeddings
+        self._n_used = needed
+
+        if self._hnsw is not None:
+            start = self._doc_count
+            total = start + len(documents)
+            if total > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(max(total, self._hnsw.get_max_elements() * 2))
+            self._hnsw.add_items(embeddings, np.arange(start, total))
+
+        self._extend_columns(documents)
+        self._refresh_layout()
+
+        logger.info(f"Added {len(documents)} documents. Total: {self._doc_count}")
     
     def search(self, query_embedding: np.ndarray, k: int = 5) -> List[Tuple[int, float, Dict]]:
         """
         Search for similar documents using cosine similarity
-        
+
+        Top-k selection is O(N + k log k) via argpartition on every path
+        (exact, quantized rerank) - never a full O(N log N) sort
+
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
-            
+
         Returns:
             List of tuples (index, distance, document)
         """
-        if self.embeddings is None or len(self.embeddings) == 0:
+        if self.embeddings is None or self._n_used == 0:
             return []
         
         # Ensure query is 1D
         if query_embedding.ndim > 1:
             query_embedding = query_embedding.flatten()
-        
-        # Compute cosine similarities
-        similarities = []
-        for idx, doc_emb in enumerate(self.embeddings):
-            # Cosine similarity
-            sim = np.dot(query_embedding, doc_emb) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_emb) + 1e-10
-            )
-            similarities.append((idx, sim))
-        
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
+
+        if self._hnsw is not None:
+            # Graph traversal instead of the full scan; hnswlib's cosine
+            # distance matches the 1 - similarity convention used below
+            k_eff = min(k, self._doc_count)
+            query = np.ascontiguousarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            labels, distances = self._hnsw.knn_query(query, k=k_eff)
+            return [
+                (int(idx), float(dist), self._row(int(idx)))
+                for idx, dist in zip(labels[0], distances[0])
+            ]
+
+        if self._q_mat is not None and self._doc_count > _QUANT_MIN_DOCS:
+            results = self._search_quantized(query_embedding, k)
+            if results is not None:
+                return results
+
+        scores = self._similarity_scores(query_embedding)
+
+        # Top-k indices, best first: argpartition selects the k winners in
+        # O(n), then only those k are actually sorted
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = top[np.argsort(-scores[top])]
+
         # Convert similarity to distance (lower is better)
         results = []
-        for idx, sim in similarities[:k]:
-            distance = 1.0 - sim  # Convert similarity to distance
-            results.append((idx, distance, self.documents[idx]))
-        
+        for idx in order:
+            distance = 1.0 - float(scores[idx])
+            results.append((int(idx), distance, self._row(int(idx))))
+
         return results
+
+    def _search_quantized(self, query_embedding: np.ndarray, k: int):
+        """
+        Two-pass search: rank everything on cheap int8 dot products, then
+        rerank a small candidate pool with exact FP32 cosine
+        Returns None when the query can't be quantized (all-zero vector)
+        """
+        query = query_embedding.astype(np.float32, copy=False).ravel()
+        query = query / (np.linalg.norm(query) + 1e-10)
+        q_scale = np.max(np.abs(query)) / 127.0
+        if q_scale == 0:
+            return None
+        query_int = np.round(query / q_scale).astype(np.int8)
+
+        # First pass: int8 dots, accumulated in int32; the query scale is
+        # constant across rows so only the per-row scale affects ranking
+        int_dots = np.einsum('nd,d->n', self._q_mat, query_int, dtype=np.int32)
+        approx = int_dots * self._q_scale
+
+        pool = min(_RERANK_POOL, approx.shape[0])
+        candidates = np.argpartition(-approx, pool - 1)[:pool]
+
+        # Second pass: exact cosine on just the candidate rows (both sides
+        # are unit vectors, so the dot product is the similarity)
+        sims = self._emb_norm[candidates] @ query
+
+        k = min(k, pool)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+
+        return [
+            (int(candidates[i]), 1.0 - float(sims[i]), self._row(int(candidates[i])))
+            for i in top
+        ]
+
+    def _similarity_scores(self, query_embedding: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of the query against every stored embedding
+        Uses the parallel Numba kernel when available; the scan is the
+        per-query hot loop, so it pays to keep it out of the interpreter
+
+        Norm accounting: document norms are baked into _emb_norm at
+        insert/load time and the query is normalized exactly once here,
+        so no norm is ever recomputed inside the scan
+        """
+        query = query_embedding.astype(np.float32, copy=False).ravel()
+        query = query / (np.linalg.norm(query) + 1e-10)
+
+        if NUMBA_AVAILABLE:
+            # Rows are pre-normalized, so the kernel is a plain parallel dot
+            return _dot_scores_numba(np.ascontiguousarray(query), self._emb_norm)
+
+        # One BLAS GEMV over the pre-normalized, pre-transposed matrix -
+        # all norms were paid at insert/load time
+        return self._mat_soa.T @ query
     
     def get_document_count(self) -> int:
         """Get total number of documents in index"""
-        return len(self.documents)
+        return self._doc_count
     
     def save(self, directory: str):
         """
@@ -109,19 +341,42 @@ class SimpleVectorStore:
         # Save embeddings
         emb_path = os.path.join(directory, 'embeddings.npy')
         if self.embeddings is not None:
-            np.save(emb_path, self.embeddings)
-        
-        # Save documents
-        docs_path = os.path.join(directory, 'documents.pkl')
-        with open(docs_path, 'wb') as f:
-            pickle.dump(self.documents, f)
+            # Only the filled rows - reserve() may have left spare capacity.
+            # Write to a temp file and rename into place: after load() the
+            # rows may still be an mmap of embeddings.npy itself, and
+            # np.save truncating the mapped file corrupts the store
+            tmp_path = os.path.join(directory, 'embeddings.tmp.npy')
+            np.save(tmp_path, self._used_embeddings())
+            os.replace(tmp_path, emb_path)
+
+        # Save the int8 matrix + per-row scales as well: a quarter of the
+        # FP32 bytes, and enough on their own to serve search if the
+        # full-precision file ever goes missing
+        if self._q_mat is not None:
+            np.save(os.path.join(directory, 'embeddings_q.npy'), self._q_mat)
+            np.save(os.path.join(directory, 'embedding_scales.npy'), self._q_scale)
+
+        # Persist the hnsw graph so load() doesn't have to rebuild it
+        if self._hnsw is not None:
+            self._hnsw.save_index(os.path.join(directory, 'hnsw.bin'))
+
+        # Save documents in columnar form - msgpack when available (smaller,
+        # faster decode), pickle otherwise
+        if MSGPACK_AVAILABLE:
+            docs_path = os.path.join(directory, 'documents.msgpack')
+            with open(docs_path, 'wb') as f:
+                f.write(msgpack.packb(self._columns, use_bin_type=True))
+        else:
+            docs_path = os.path.join(directory, 'documents.pkl')
+            with open(docs_path, 'wb') as f:
+                pickle.dump(self._columns, f)
         
         # Save metadata
         meta_path = os.path.join(directory, 'metadata.pkl')
         metadata = {
             'dimension': self.dimension,
             'index_type': self.index_type,
-            'document_count': len(self.documents)
+            'document_count': self._doc_count
         }
         with open(meta_path, 'wb') as f:
             pickle.dump(metadata, f)
@@ -142,19 +397,74 @@ class SimpleVectorStore:
         
         # Load embeddings
         emb_path = os.path.join(directory, 'embeddings.npy')
+        q_path = os.path.join(directory, 'embeddings_q.npy')
         if os.path.exists(emb_path):
-            self.embeddings = np.load(emb_path)
-        
-        # Load documents
-        docs_path = os.path.join(directory, 'documents.pkl')
-        with open(docs_path, 'rb') as f:
-            self.documents = pickle.load(f)
+            # Memory-map the raw matrix: the OS pages rows in on demand and
+            # the file never occupies a second in-RAM copy. Legacy float64
+            # indexes still get materialized to the contiguous float32
+            # layout the scoring paths expect
+            mapped = np.load(emb_path, mmap_mode='r')
+            if mapped.dtype == np.float32:
+                self.embeddings = mapped
+            else:
+                self.embeddings = np.ascontiguousarray(mapped, dtype=np.float32)
+        elif os.path.exists(q_path):
+            # Only the quantized pair is on disk - dequantize back to the
+            # normalized FP32 rows (unit norm up to int8 rounding)
+            q_mat = np.load(q_path)
+            scales = np.load(os.path.join(directory, 'embedding_scales.npy'))
+            self.embeddings = np.ascontiguousarray(
+                q_mat.astype(np.float32) * scales[:, None]
+            )
+        if self.embeddings is not None:
+            self._n_used = len(self.embeddings)
+
+        # Load documents - prefer the msgpack file, keep reading legacy
+        # pickle stores built before the format switch
+        msgpack_path = os.path.join(directory, 'documents.msgpack')
+        if MSGPACK_AVAILABLE and os.path.exists(msgpack_path):
+            with open(msgpack_path, 'rb') as f:
+                loaded_docs = msgpack.unpackb(f.read(), raw=False)
+        else:
+            docs_path = os.path.join(directory, 'documents.pkl')
+            with open(docs_path, 'rb') as f:
+                loaded_docs = pickle.load(f)
+
+        if isinstance(loaded_docs, dict):
+            self._columns = loaded_docs
+            self._doc_count = len(next(iter(loaded_docs.values()))) if loaded_docs else 0
+        else:
+            # Legacy list-of-dicts store - convert to the columnar layout
+            self._columns = {}
+            self._doc_count = 0
+            self._extend_columns(loaded_docs)
+
+        # Deserialization produced a fresh string per cell; re-intern the
+        # low-cardinality columns so repeats collapse to shared objects
+        for key in ('department', 'type'):
+            column = self._columns.get(key)
+            if column:
+                self._columns[key] = [
+                    sys.intern(value) if isinstance(value, str) else value
+                    for value in column
+                ]
         
         self.dimension = metadata['dimension']
         self.index_type = metadata['index_type']
+        self._refresh_layout()
+
+        hnsw_path = os.path.join(directory, 'hnsw.bin')
+        if self.index_type == 'hnsw' and HNSWLIB_AVAILABLE and os.path.exists(hnsw_path):
+            self._hnsw = hnswlib.Index(space='cosine', dim=self.dimension)
+            self._hnsw.load_index(hnsw_path, max_elements=max(self._doc_count, 1))
+        else:
+            if self.index_type == 'hnsw':
+                logger.warning("hnsw index unavailable - falling back to linear scan")
+                self.index_type = 'simple'
+            self._hnsw = None
         
         logger.info(f"Vector store loaded from {directory}")
-        logger.info(f"  Documents: {len(self.documents)}")
+        logger.info(f"  Documents: {self._doc_count}")
 
 
 class KnowledgeBase:
@@ -178,68 +488,166 @@ class KnowledgeBase:
         import sqlite3
         
         conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        # Load services
-        cursor.execute('SELECT * FROM services')
-        rows = cursor.fetchall()
-        
+
+        # Size the embeddings buffer once up front so the insert below is a
+        # single slice write instead of a growing series of copies
+        cursor.execute('SELECT COUNT(*) FROM services')
+        total = cursor.fetchone()[0]
+        self.vector_store.reserve(self.vector_store._n_used + total)
+
+        # Only the six columns the documents actually use - SELECT * would
+        # also decode the wide JSON blobs (requirements, procedure, ...)
+        cursor.execute(
+            'SELECT id, name_en, name_ta, description_en, description_ta, department '
+            'FROM services'
+        )
+
         documents = []
         texts = []
-        
-        for row in rows:
-            # Create document with both English and Tamil
-            doc = {
-                'id': row[0],
-                'name_en': row[1],
-                'name_ta': row[2],
-                'description_en': row[3],
-                'description_ta': row[4],
-                'department': row[5],
-                'type': 'service'
-            }
-            
-            # Combine text for embedding
-            text = f"{row[1]} {row[2]} {row[3]} {row[4]}"
-            
-            documents.append(doc)
-            texts.append(text)
-        
+
+        # fetchmany keeps memory flat and amortizes the Python/C crossings
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                # Create document with both English and Tamil
+                # department and type repeat across most rows - intern them
+                # so every row shares the same string object
+                doc = {
+                    'id': row['id'],
+                    'name_en': row['name_en'],
+                    'name_ta': row['name_ta'],
+                    'description_en': row['description_en'],
+                    'description_ta': row['description_ta'],
+                    'department': sys.intern(row['department']),
+                    'type': sys.intern('service')
+                }
+
+                # Combine text for embedding
+                text = f"{row['name_en']} {row['name_ta']} {row['description_en']} {row['description_ta']}"
+
+                documents.append(doc)
+                texts.append(text)
+
         conn.close()
-        
-        # Generate embeddings
+
+        # Generate embeddings, skipping texts whose embedding is already in
+        # the on-disk cache - model inference dominates rebuild time, and
+        # most rows don't change between build_knowledge_base runs
         logger.info(f"Generating embeddings for {len(texts)} documents...")
-        embeddings = embedding_generator.generate_embeddings_batch(texts)
-        
+        embeddings = self._embed_with_cache(db_path, texts, embedding_generator)
+
         # Add to vector store
         self.vector_store.add_documents(embeddings, documents)
-        
+
         logger.info(f"✓ Added {len(documents)} documents to knowledge base")
+
+    @staticmethod
+    def _embed_chunked(texts: List[str], embedding_generator) -> np.ndarray:
+        """
+        Embed texts in _EMBED_CHUNK-sized batches across a thread pool -
+        the numeric kernels underneath release the GIL, so threads keep
+        every core busy. Order is preserved (executor.map is ordered)
+        """
+        # A TF-IDF embedder that hasn't been fitted yet would auto-fit
+        # inside each pool thread on its own small chunk - a racy fit over
+        # a fraction of the corpus. Fit once on the full list up front.
+        if getattr(embedding_generator, 'is_fitted', True) is False:
+            embedding_generator.fit(texts)
+
+        chunks = [texts[i:i + _EMBED_CHUNK] for i in range(0, len(texts), _EMBED_CHUNK)]
+        if len(chunks) <= 1:
+            # Not enough work to amortize a pool
+            batch = embedding_generator.generate_embeddings_batch(texts)
+            return np.asarray(batch, dtype=np.float32)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            parts = list(executor.map(embedding_generator.generate_embeddings_batch, chunks))
+        return np.vstack([np.asarray(part, dtype=np.float32) for part in parts])
+
+    def _embed_with_cache(self, db_path: str, texts: List[str], embedding_generator) -> np.ndarray:
+        """
+        Embed texts through a persistent hash-keyed cache stored next to
+        the database - only texts not seen before hit the model
+        """
+        cache_path = os.path.join(os.path.dirname(db_path) or '.', '.emb_cache.pkl')
+        cache = {}
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cache = pickle.load(f)
+            except Exception:
+                logger.warning("Embedding cache unreadable - rebuilding it")
+                cache = {}
+
+        keys = [
+            hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+            for text in texts
+        ]
+        miss_idx = [i for i, key in enumerate(keys) if key not in cache]
+
+        if miss_idx:
+            miss_embs = self._embed_chunked(
+                [texts[i] for i in miss_idx], embedding_generator
+            )
+            for i, emb in zip(miss_idx, miss_embs):
+                cache[keys[i]] = emb
+            with open(cache_path, 'wb') as f:
+                pickle.dump(cache, f)
+            logger.info(f"Embedded {len(miss_idx)} new texts, "
+                        f"{len(texts) - len(miss_idx)} served from cache")
+        else:
+            logger.info(f"All {len(texts)} embeddings served from cache")
+
+        if not keys:
+            return np.empty((0, self.embedding_dimension), dtype=np.float32)
+        return np.stack([cache[key] for key in keys])
     
-    def search(self, query: str, embedding_generator, k: int = 5) -> List[Dict]:
+    def search(self, query: str, embedding_generator, k: int = 5) -> List[ServiceDoc]:
         """
         Search knowledge base with natural language query
-        
+
         Args:
             query: User query (Tamil or English)
             embedding_generator: Embedding generator instance
             k: Number of results
-            
+
         Returns:
             List of relevant documents with scores
         """
         # Generate query embedding
         query_embedding = embedding_generator.generate_embedding(query)
-        
+
+        return self.search_by_vector(query_embedding, k=k)
+
+    def search_by_vector(self, query_embedding: np.ndarray, k: int = 5) -> List[ServiceDoc]:
+        """
+        Search knowledge base with a precomputed query embedding
+
+        Lets callers that already embedded the query reuse the vector
+        instead of paying for a second encode inside search
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results
+
+        Returns:
+            List of ServiceDoc results with scores, best first
+        """
         # Search vector store
         results = self.vector_store.search(query_embedding, k=k)
-        
-        # Format results
+
+        # Wrap hits in slotted ServiceDoc instances; unknown keys from
+        # legacy stores are dropped rather than crashing the constructor
         formatted_results = []
         for idx, distance, doc in results:
-            doc['similarity_score'] = 1.0 / (1.0 + distance)  # Convert distance to similarity
-            formatted_results.append(doc)
-        
+            kwargs = {key: value for key, value in doc.items() if key in SERVICE_DOC_FIELDS}
+            kwargs['similarity_score'] = 1.0 / (1.0 + distance)  # Convert distance to similarity
+            formatted_results.append(ServiceDoc(**kwargs))
+
         return formatted_results
     
     def save(self, directory: str):
@@ -0,0 +1 @@
+"""Nlp Engine package"""
@@ -5,10 +5,43 @@ Makes the chatbot more natural and human-like without heavy models
 
 import logging
 import random
+import re
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Compiled once at import: the Tamil-script probe and greeting check run
+# on every response, and the regex engine scans in C instead of a
+# per-character ord() loop
+_TAMIL_RE = re.compile(r'[\u0B80-\u0BFF]')
+_GREET_RE = re.compile(r'\b(?:hello|hi|hey|வணக்கம்)\b', re.IGNORECASE)
+
+# Opening/closing pools built once at import as immutable tuples instead
+# of fresh lists on every make_conversational call
+_TA_OPENINGS = (
+    "நிச்சயமாக! உங்களுக்கு உதவ மகிழ்ச்சி. ",
+    "சரி! நான் விளக்குகிறேன். ",
+    "நல்ல கேள்வி! ",
+)
+_TA_CLOSINGS = (
+    "\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊",
+    "\n\nமேலும் விவரங்கள் தேவையா என்று தெரியப்படுத்துங்கள்!",
+    "\n\nவேறு கேள்விகள் இருந்தால் கேளுங்கள்! 🙏",
+)
+_EN_OPENINGS = (
+    "Sure! Let me help you with that. ",
+    "I'd be happy to help! ",
+    "Great question! Here's what you need to know: ",
+    "Let me explain that for you. ",
+    "I can definitely help you with this. ",
+)
+_EN_CLOSINGS = (
+    "\n\nIs there anything else you'd like to know? 😊",
+    "\n\nFeel free to ask if you need more details!",
+    "\n\nLet me know if you need any clarification! I'm here to help. 🙏",
+    "\n\nHope this helps! Ask me anything else you need. 👍",
+)
+
 
 class ConversationalEngine:
     """
@@ -22,39 +55,18 @@ class ConversationalEngine:
         """Make response more conversational with templates"""
         
         # Detect if it's a greeting
-        if any(word in query.lower() for word in ['வணக்கம்', 'hello', 'hi', 'hey']):
+        if _GREET_RE.search(query):
             return factual_response
-        
+
         # Bilingual conversational elements
-        if language == 'tamil' or any(ord(c) >= 0x0B80 and ord(c) <= 0x0BFF for c in factual_response[:50]):
-            openings = [
-                "நிச்சயமாக! உங்களுக்கு உதவ மகிழ்ச்சி. ",
-                "சரி! நான் விளக்குகிறேன். ",
-                "நல்ல கேள்வி! ",
-            ]
-            closings = [
-                "\n\nவேறு ஏதாவது தெரிந்து கொள்ள வேண்டுமா? 😊",
-                "\n\nமேலும் விவரங்கள் தேவையா என்று தெரியப்படுத்துங்கள்!",
-                "\n\nவேறு கேள்விகள் இருந்தால் கேளுங்கள்! 🙏",
-            ]
+        if language == 'tamil' or _TAMIL_RE.search(factual_response, 0, 50):
+            openings, closings = _TA_OPENINGS, _TA_CLOSINGS
         else:
-            openings = [
-                "Sure! Let me help you with that. ",
-                "I'd be happy to help! ",
-                "Great question! Here's what you need to know: ",
-                "Let me explain that for you. ",
-                "I can definitely help you with this. ",
-            ]
-            closings = [
-                "\n\nIs there anything else you'd like to know? 😊",
-                "\n\nFeel free to ask if you need more details!",
-                "\n\nLet me know if you need any clarification! I'm here to help. 🙏",
-                "\n\nHope this helps! Ask me anything else you need. 👍",
-            ]
-        
+            openings, closings = _EN_OPENINGS, _EN_CLOSINGS
+
         opening = random.choice(openings)
         closing = random.choice(closings)
-        
+
         return f"{opening}\n\n{factual_response}{closing}"
 
 class SimplifiedConversationalEngine:
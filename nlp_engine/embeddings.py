@@ -4,8 +4,9 @@ Uses sentence-transformers with multilingual models for generating embeddings
 No external API calls - completely local processing
 """
 
-from sentence_transformers import SentenceTransformer
+import hashlib
 import numpy as np
+from collections import OrderedDict
 from typing import List, Union
 import logging
 import os
@@ -13,6 +14,10 @@ import os
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How many embeddings to keep in the per-instance LRU cache; repeat
+# queries skip the transformer forward pass entirely
+_EMB_CACHE_MAX = 10000
+
 
 class LocalEmbeddingGenerator:
     """
@@ -20,68 +25,167 @@ class LocalEmbeddingGenerator:
     Supports Tamil, English, and other Indian languages
     """
     
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', backend: str = 'onnx'):
         """
         Initialize embedding generator with multilingual model
-        
+
         Args:
             model_name: Sentence transformer model name
                 - 'paraphrase-multilingual-mpnet-base-v2' (default): Best for multilingual
                 - 'distiluse-base-multilingual-cased-v2': Faster, lighter
+            backend: Inference backend - 'onnx' (default, tries the int8
+                quantized model first, then plain ONNX, then PyTorch) or
+                'torch' to load the model the classic way
         """
         logger.info(f"Loading embedding model: {model_name}")
-        
+
+        # LRU cache keyed by text hash - oldest entry falls out at capacity
+        self._cache: OrderedDict = OrderedDict()
+
         try:
-            self.model = SentenceTransformer(model_name)
+            self.model = self._load_model(model_name, backend)
             self.model_name = model_name
             self.embedding_dimension = self.model.get_sentence_embedding_dimension()
-            
+
             logger.info(f"✓ Model loaded successfully")
             logger.info(f"  Embedding dimension: {self.embedding_dimension}")
-            
+
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
+
+    @staticmethod
+    def _load_model(model_name: str, backend: str) -> 'SentenceTransformer':
+        """
+        Load the model on the fastest available backend
+
+        ONNX Runtime fuses attention/layernorm and the qint8 export runs
+        int8 GEMM - roughly half the bytes and double the throughput of
+        FP32 PyTorch on CPU. Every step degrades gracefully: quantized
+        ONNX -> plain ONNX -> PyTorch
+        """
+        # Imported here rather than at module scope: sentence_transformers
+        # pulls in torch, so callers that never construct this class (e.g.
+        # the TF-IDF path) skip hundreds of MB of import cost
+        from sentence_transformers import SentenceTransformer
+
+        if backend == 'onnx':
+            try:
+                return SentenceTransformer(
+                    model_name,
+                    backend='onnx',
+                    model_kwargs={'file_name': 'onnx/model_qint8_avx512_vnni.onnx'},
+                )
+            except Exception:
+                logger.warning("Quantized ONNX model unavailable - trying plain ONNX")
+            try:
+                return SentenceTransformer(model_name, backend='onnx')
+            except Exception:
+                logger.warning("ONNX backend unavailable - falling back to PyTorch")
+            return SentenceTransformer(model_name)
+        if backend == 'torch':
+            return SentenceTransformer(model_name)
+        return SentenceTransformer(model_name, backend=backend)
     
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Compact hash key for the embedding cache"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _cache_put(self, key: bytes, embedding: np.ndarray):
+        """Insert into the LRU cache, evicting the oldest entry at capacity"""
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        if len(self._cache) > _EMB_CACHE_MAX:
+            self._cache.popitem(last=False)
+
     def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
-        
+
+        Repeat texts are served from the LRU cache without touching the
+        model - by far the cheapest way to answer a repeated query
+
         Args:
             text: Input text (Tamil or English)
-            
+
         Returns:
             Numpy array of embeddings
         """
+        key = self._cache_key(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
+            # fp16 in transit: halves cache memory and the bytes moved per
+            # lookup; similarity math upcasts to fp32 at compute time
+            embedding = self.model.encode(
+                text, convert_to_numpy=True, normalize_embeddings=True
+            ).astype(np.float16)
+            self._cache_put(key, embedding)
             return embedding
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             return np.zeros(self.embedding_dimension)
-    
-    def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+
+    def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32,
+                                  show_progress_bar: bool = False) -> np.ndarray:
         """
         Generate embeddings for multiple texts (batch processing)
-        
+
+        Only texts missing from the cache hit the model; cached rows are
+        scattered back into their original positions
+
         Args:
             texts: List of input texts
             batch_size: Batch size for processing
-            
+            show_progress_bar: Show tqdm progress (off by default - it
+                prints to stderr on every batch in the request hot path)
+
         Returns:
             Numpy array of embeddings (n_texts x embedding_dim)
         """
-        try:
-            embeddings = self.model.encode(
-                texts, 
-                batch_size=batch_size,
-                show_progress_bar=True,
-                convert_to_numpy=True
-            )
-            return embeddings
-        except Exception as e:
-            logger.error(f"Error generating batch embeddings: {e}")
-            return np.zeros((len(texts), self.embedding_dimension))
+        keys = [self._cache_key(text) for text in texts]
+        out = [self._cache.get(key) for key in keys]
+        miss_idx = [i for i, emb in enumerate(out) if emb is None]
+
+        if miss_idx:
+            miss_texts = [texts[i] for i in miss_idx]
+
+            # encode pads every batch to its longest sequence; sorting by
+            # token length first keeps each batch's lengths similar, so
+            # the O(batch x seq^2) attention cost isn't spent on padding
+            try:
+                lengths = self.model.tokenizer(
+                    miss_texts, add_special_tokens=False, return_length=True
+                )['length']
+            except Exception:
+                lengths = [len(t) for t in miss_texts]
+            order = np.argsort(lengths, kind='stable')
+
+            try:
+                encoded = self.model.encode(
+                    [miss_texts[i] for i in order],
+                    batch_size=batch_size,
+                    show_progress_bar=show_progress_bar,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            except Exception as e:
+                logger.error(f"Error generating batch embeddings: {e}")
+                return np.zeros((len(texts), self.embedding_dimension))
+
+            # Undo the length sort before scattering rows back
+            encoded = encoded[np.argsort(order)].astype(np.float16)
+            for i, embedding in zip(miss_idx, encoded):
+                self._cache_put(keys[i], embedding)
+                out[i] = embedding
+
+        # fp16 in transit: the batch matrix is storage/bandwidth only -
+        # consumers upcast to fp32 before doing any dot products
+        return np.array(out, dtype=np.float16)
     
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
@@ -94,13 +198,12 @@ class LocalEmbeddingGenerator:
         Returns:
             Similarity score (0 to 1)
         """
-        emb1 = self.generate_embedding(text1)
-        emb2 = self.generate_embedding(text2)
-        
-        # Cosine similarity
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
-        
-        return float(similarity)
+        emb1 = np.asarray(self.generate_embedding(text1), dtype=np.float32)
+        emb2 = np.asarray(self.generate_embedding(text2), dtype=np.float32)
+
+        # Embeddings are unit-norm at encode time (normalize_embeddings=True),
+        # so cosine is a plain dot product here
+        return float(np.dot(emb1, emb2))
     
     def find_most_similar(self, query: str, candidates: List[str], top_k: int = 5) -> List[tuple]:
         """
@@ -114,30 +217,44 @@ class LocalEmbeddingGenerator:
         Returns:
             List of tuples (index, similarity_score)
         """
-        query_emb = self.generate_embedding(query)
-        candidate_embs = self.generate_embeddings_batch(candidates)
-        
-        # Compute similarities
-        similarities = []
-        for idx, cand_emb in enumerate(candidate_embs):
-            similarity = np.dot(query_emb, cand_emb) / (
-                np.linalg.norm(query_emb) * np.linalg.norm(cand_emb)
-            )
-            similarities.append((idx, float(similarity)))
-        
-        # Sort by similarity
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return similarities[:top_k]
+        # Embeddings travel as fp16; upcast once here so the normalization
+        # and GEMV accumulate in fp32
+        query_emb = np.asarray(self.generate_embedding(query), dtype=np.float32)
+        candidate_embs = np.asarray(self.generate_embeddings_batch(candidates), dtype=np.float32)
+
+        # Rows come back unit-norm from encode, so one GEMV gives cosine
+        # directly - no per-call normalization pass
+        sims = candidate_embs @ query_emb
+
+        # argpartition picks the top_k in O(n); only those get sorted
+        top_k = min(top_k, sims.shape[0])
+        top = np.argpartition(-sims, top_k - 1)[:top_k]
+        top = top[np.argsort(-sims[top])]
+
+        return [(int(idx), float(sims[idx])) for idx in top]
     
     def save_embeddings(self, embeddings: np.ndarray, filepath: str):
-        """Save embeddings to file"""
-        np.save(filepath, embeddings)
+        """
+        Save embeddings as int8 with per-row scales (symmetric
+        quantization) - a quarter of the FP32 file size, and similarity
+        scans over the reloaded matrix move a quarter of the bytes
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+        np.savez(filepath, q=quantized, scales=scales.astype(np.float32))
         logger.info(f"Embeddings saved to {filepath}")
-    
+
     def load_embeddings(self, filepath: str) -> np.ndarray:
-        """Load embeddings from file"""
-        embeddings = np.load(filepath)
+        """Load embeddings from file, dequantizing int8 archives to float32"""
+        npz_path = filepath if filepath.endswith('.npz') else filepath + '.npz'
+        if os.path.exists(npz_path):
+            data = np.load(npz_path)
+            embeddings = data['q'].astype(np.float32) * data['scales'][:, None]
+        else:
+            # Legacy raw .npy file from before the quantized format
+            embeddings = np.load(filepath)
         logger.info(f"Embeddings loaded from {filepath}")
         return embeddings
 
@@ -3,7 +3,7 @@ Simple TF-IDF based embeddings - No external model downloads needed
 Fast, lightweight alternative to sentence transformers
 """
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 import numpy as np
 import pickle
 import os
@@ -16,14 +16,32 @@ class SimpleTfidfEmbeddings:
     No model downloads required - works out of the box
     """
     
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=768,  # Match dimension of sentence transformers
-            ngram_range=(1, 2),
-            min_df=1,
-            lowercase=True
-        )
-        self.is_fitted = False
+    def __init__(self, use_idf: bool = False):
+        """
+        Args:
+            use_idf: True fits a classic TfidfVectorizer on the corpus;
+                the default is a stateless HashingVectorizer - no fit
+                step, no vocabulary, and the output is exactly 768 dims,
+                so a single text no longer produces the degenerate
+                auto-fit vectors the TF-IDF path did
+        """
+        if use_idf:
+            self.vectorizer = TfidfVectorizer(
+                max_features=768,  # Match dimension of sentence transformers
+                ngram_range=(1, 2),
+                min_df=1,
+                lowercase=True
+            )
+            self.is_fitted = False
+        else:
+            self.vectorizer = HashingVectorizer(
+                n_features=768,
+                ngram_range=(1, 2),
+                alternate_sign=False,
+                norm='l2',
+                lowercase=True
+            )
+            self.is_fitted = True
         self.embedding_dimension = 768
         print("✓ Simple TF-IDF embedding system initialized (no downloads needed)")
     
@@ -37,41 +55,37 @@ class SimpleTfidfEmbeddings:
         if not self.is_fitted:
             # Auto-fit on first use
             self.fit([text])
-        
-        vector = self.vectorizer.transform([text]).toarray()[0]
-        
-        # Pad to 768 dimensions if needed
-        if len(vector) < 768:
-            vector = np.pad(vector, (0, 768 - len(vector)))
-        else:
-            vector = vector[:768]
-        
-        return vector
-    
+
+        return self._transform_padded([text])[0]
+
     def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """Generate embeddings for multiple texts"""
         if not self.is_fitted:
             self.fit(texts)
-        
-        vectors = self.vectorizer.transform(texts).toarray()
-        
-        # Pad all vectors to 768 dimensions
-        padded_vectors = []
-        for vector in vectors:
-            if len(vector) < 768:
-                vector = np.pad(vector, (0, 768 - len(vector)))
-            else:
-                vector = vector[:768]
-            padded_vectors.append(vector)
-        
-        return np.array(padded_vectors)
+
+        return self._transform_padded(texts)
+
+    def _transform_padded(self, texts: List[str]) -> np.ndarray:
+        """
+        Vectorize texts into one float32 (N, 768) matrix
+
+        Slices/pads the sparse matrix directly into a preallocated dense
+        buffer instead of densifying the whole vocabulary and re-padding
+        each row with np.pad in a Python loop
+        """
+        sparse = self.vectorizer.transform(texts).astype(np.float32)
+        out = np.zeros((sparse.shape[0], self.embedding_dimension), dtype=np.float32)
+        width = min(sparse.shape[1], self.embedding_dimension)
+        out[:, :width] = sparse[:, :width].toarray()
+        return out
     
     def compute_similarity(self, text1: str, text2: str) -> float:
         """Compute cosine similarity between two texts"""
         emb1 = self.generate_embedding(text1)
         emb2 = self.generate_embedding(text2)
         
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2) + 1e-10)
+        # vdot-based cosine: no norm-type dispatch and a single sqrt
+        similarity = np.dot(emb1, emb2) / np.sqrt(np.vdot(emb1, emb1) * np.vdot(emb2, emb2) + 1e-10)
         return float(similarity)
     
     def save(self, filepath: str):
@@ -4,14 +4,63 @@ Handles language detection, text preprocessing, and Tamil language support
 """
 
 import re
+from collections import Counter
 from typing import List, Dict, Tuple
 import unicodedata
-from langdetect import detect
+import numpy as np
 import logging
 
+# pyahocorasick - optional, single-pass multi-keyword matching; the
+# compiled-regex alternation below is the fallback
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# langdetect loads its language profiles at import time, so it is pulled
+# in lazily on the first non-Tamil detection and cached here
+_langdetect_detect = None
+
+
+def _detect(text: str) -> str:
+    """Lazily-imported langdetect.detect"""
+    global _langdetect_detect
+    if _langdetect_detect is None:
+        from langdetect import detect as _langdetect_detect
+    return _langdetect_detect(text)
+
+
+# Quick C-level probe for any Tamil codepoint
+_TAMIL_CHAR_RE = re.compile(r'[\u0B80-\u0BFF]')
+# Whitespace codepoints excluded from the Tamil-ratio denominator
+_WS_CODES = np.array([0x20, 0x09, 0x0A, 0x0D], dtype=np.uint32)
+# Tamil/Latin/digit runs - the Tamil tokenizer's split pattern
+_TOKEN_RE = re.compile(r'[\u0B80-\u0BFF]+|[a-zA-Z]+|\d+')
+
+# Greeting/farewell phrases compiled into one alternation each: a single
+# regex pass over the text instead of one substring scan per phrase
+_GREETING_RE = re.compile('|'.join(map(re.escape, [
+    '\u0BB5\u0BA3\u0B95\u0BCD\u0B95\u0BAE\u0BCD', 'hello', 'hi', 'hey', 'good morning', 'good afternoon',
+    'good evening', '\u0BB5\u0BBE\u0BB4\u0BCD\u0BA4\u0BCD\u0BA4\u0BC1\u0B95\u0BCD\u0B95\u0BB3\u0BCD', '\u0BA8\u0BB2\u0BCD\u0BB2 \u0B95\u0BBE\u0BB2\u0BC8', '\u0BA8\u0BB2\u0BCD\u0BB2 \u0BAA\u0BBF\u0BB1\u0BCD\u0BAA\u0B95\u0BB2\u0BCD'
+])))
+_FAREWELL_RE = re.compile('|'.join(map(re.escape, [
+    'bye', 'goodbye', 'see you', 'thanks', 'thank you',
+    '\u0BA8\u0BA9\u0BCD\u0BB1\u0BBF', '\u0BAA\u0BCB\u0BAF\u0BCD\u0BB5\u0BB0\u0BC1\u0B95\u0BBF\u0BB1\u0BC7\u0BA9\u0BCD', '\u0BAA\u0BBF\u0BB1\u0B95\u0BC1 \u0BAA\u0BBE\u0BB0\u0BCD\u0BAA\u0BCD\u0BAA\u0BCB\u0BAE\u0BCD'
+])))
+
+# Common Tamil stopwords - a module-level frozenset so membership tests
+# skip the per-instance attribute lookup
+TAMIL_STOPWORDS = frozenset({
+    '\u0B85\u0BA4\u0BC1', '\u0B87\u0BA4\u0BC1', '\u0B85\u0BA8\u0BCD\u0BA4', '\u0B87\u0BA8\u0BCD\u0BA4', '\u0B85\u0BB5\u0BB0\u0BCD', '\u0B87\u0BB5\u0BB0\u0BCD', '\u0B8E\u0BA9\u0BCD\u0BA9', '\u0B8E\u0B99\u0BCD\u0B95\u0BC1',
+    '\u0B8E\u0BAA\u0BCD\u0BAA\u0B9F\u0BBF', '\u0B8E\u0BAA\u0BCD\u0BAA\u0BCB\u0BA4\u0BC1', '\u0B8E\u0BA4\u0BB1\u0BCD\u0B95\u0BC1', '\u0BAF\u0BBE\u0BB0\u0BCD', '\u0B8E\u0BA4\u0BC1', '\u0B8E\u0BB5\u0BCD\u0BB5\u0BBE\u0BB1\u0BC1',
+    '\u0B92\u0BB0\u0BC1', '\u0BAE\u0BB1\u0BCD\u0BB1\u0BC1\u0BAE\u0BCD', '\u0B85\u0BB2\u0BCD\u0BB2\u0BA4\u0BC1', '\u0B86\u0BA9\u0BBE\u0BB2\u0BCD', '\u0B89\u0B9F\u0BA9\u0BCD', '\u0BAA\u0BBF\u0BA9\u0BCD',
+    '\u0BAE\u0BC1\u0BA9\u0BCD', '\u0BAE\u0BC7\u0BB2\u0BCD', '\u0B95\u0BC0\u0BB4\u0BCD', '\u0B89\u0BB3\u0BCD\u0BB3\u0BC7', '\u0BB5\u0BC6\u0BB3\u0BBF\u0BAF\u0BC7'
+})
+
 
 class TamilNLPProcessor:
     """
@@ -21,33 +70,31 @@ class TamilNLPProcessor:
     
     # Tamil Unicode ranges
     TAMIL_UNICODE_RANGE = (0x0B80, 0x0BFF)
-    
-    # Common Tamil stopwords
-    TAMIL_STOPWORDS = {
-        'அது', 'இது', 'அந்த', 'இந்த', 'அவர்', 'இவர்', 'என்ன', 'எங்கு', 
-        'எப்படி', 'எப்போது', 'எதற்கு', 'யார்', 'எது', 'எவ்வாறு',
-        'ஒரு', 'மற்றும்', 'அல்லது', 'ஆனால்', 'உடன்', 'பின்',
-        'முன்', 'மேல்', 'கீழ்', 'உள்ளே', 'வெளியே'
-    }
+
+    # Kept as a class alias for existing callers
+    TAMIL_STOPWORDS = TAMIL_STOPWORDS
     
     def __init__(self):
         logger.info("Initializing Tamil NLP Processor")
     
     def is_tamil_text(self, text: str) -> bool:
         """Check if text contains Tamil characters"""
-        tamil_chars = 0
-        total_chars = 0
-        
-        for char in text:
-            if char.strip():
-                total_chars += 1
-                code_point = ord(char)
-                if self.TAMIL_UNICODE_RANGE[0] <= code_point <= self.TAMIL_UNICODE_RANGE[1]:
-                    tamil_chars += 1
-        
+        # No Tamil codepoint anywhere means the ratio is zero - this regex
+        # probe settles the common all-English query without any counting
+        if not _TAMIL_CHAR_RE.search(text):
+            return False
+
+        # Count over the raw codepoints in NumPy instead of a per-char
+        # Python loop with ord() and strip()
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        non_ws = ~np.isin(codes, _WS_CODES)
+        total_chars = int(non_ws.sum())
         if total_chars == 0:
             return False
-        
+
+        low, high = self.TAMIL_UNICODE_RANGE
+        tamil_chars = int(((codes >= low) & (codes <= high) & non_ws).sum())
+
         return (tamil_chars / total_chars) > 0.3  # 30% threshold
     
     def normalize_tamil_text(self, text: str) -> str:
@@ -66,28 +113,32 @@ class TamilNLPProcessor:
         text = self.normalize_tamil_text(text)
         
         # Split by whitespace and punctuation
-        tokens = re.findall(r'[\u0B80-\u0BFF]+|[a-zA-Z]+|\d+', text)
-        
+        tokens = _TOKEN_RE.findall(text)
+
         return tokens
     
     def remove_stopwords(self, tokens: List[str]) -> List[str]:
         """Remove Tamil stopwords"""
-        return [token for token in tokens if token not in self.TAMIL_STOPWORDS]
-    
+        stopwords = TAMIL_STOPWORDS
+        return [token for token in tokens if token not in stopwords]
+
     def extract_keywords(self, text: str, top_n: int = 5) -> List[str]:
-        """Extract keywords from Tamil text"""
-        tokens = self.tokenize_tamil(text)
-        filtered_tokens = self.remove_stopwords(tokens)
-        
-        # Count frequencies
-        freq = {}
-        for token in filtered_tokens:
-            freq[token] = freq.get(token, 0) + 1
-        
-        # Sort by frequency
-        sorted_tokens = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-        
-        return [token for token, _ in sorted_tokens[:top_n]]
+        """
+        Extract keywords from Tamil text
+
+        One fused pass: tokens stream straight from the compiled pattern
+        into the counter with stopwords skipped inline, instead of
+        tokenize -> filter -> count building a list at each step
+        """
+        text = unicodedata.normalize('NFC', text)
+        stopwords = TAMIL_STOPWORDS
+        counts = Counter()
+        for match in _TOKEN_RE.finditer(text):
+            token = match.group()
+            if token not in stopwords:
+                counts[token] += 1
+
+        return [token for token, _ in counts.most_common(top_n)]
 
 
 class BilingualNLPEngine:
@@ -126,7 +177,53 @@ class BilingualNLPEngine:
             'fees': ['fee', 'cost', 'charge', 'price', 'கட்டணம்', 'விலை', 'எவ்வளவு'],
             'eligibility': ['eligible', 'eligibility', 'qualify', 'தகுதி', 'யோக்கியதை']
         }
-    
+
+        # One matcher per table, built once - extraction becomes a single
+        # linear pass over the query instead of keyword-by-keyword scans
+        self._intent_matcher = self._build_matcher(self.intent_keywords)
+        self._service_matcher = self._build_matcher(self.service_keywords)
+
+    @staticmethod
+    def _build_matcher(keyword_table: Dict[str, List[str]]):
+        """
+        Build a multi-keyword matcher for a {label: [keywords]} table
+
+        Returns a callable text -> label (or None); earlier labels in the
+        table win, preserving the old loop's priority order. Uses an
+        Aho-Corasick automaton when pyahocorasick is installed, otherwise
+        one compiled alternation regex per label
+        """
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for priority, (label, keywords) in enumerate(keyword_table.items()):
+                for keyword in keywords:
+                    # Keep only the highest-priority label per keyword
+                    if not automaton.exists(keyword):
+                        automaton.add_word(keyword, (priority, label))
+            automaton.make_automaton()
+
+            def match(text: str):
+                best = None
+                for _, value in automaton.iter(text):
+                    if best is None or value[0] < best[0]:
+                        best = value
+                return best[1] if best else None
+
+            return match
+
+        compiled = [
+            (label, re.compile('|'.join(re.escape(k) for k in keywords)))
+            for label, keywords in keyword_table.items()
+        ]
+
+        def match(text: str):
+            for label, pattern in compiled:
+                if pattern.search(text):
+                    return label
+            return None
+
+        return match
+
     def detect_language(self, text: str) -> str:
         """Detect language of input text"""
         try:
@@ -134,7 +231,7 @@ class BilingualNLPEngine:
                 return 'tamil'
             
             # Try langdetect for other languages
-            lang = detect(text)
+            lang = _detect(text)
             if lang in ['en', 'hi']:
                 return lang
             
@@ -142,43 +239,42 @@ class BilingualNLPEngine:
         except:
             return 'unknown'
     
-    def preprocess_text(self, text: str) -> str:
-        """Preprocess text for both Tamil and English"""
+    def preprocess_text(self, text: str, language: str = None) -> str:
+        """
+        Preprocess text for both Tamil and English
+
+        Args:
+            text: Input text
+            language: Already-detected language, if the caller has one -
+                saves a second detection pass (langdetect isn't cheap)
+        """
         # Convert to lowercase (for English)
         text_lower = text.lower()
-        
+
+        if language is None:
+            language = self.detect_language(text)
+
         # Normalize Tamil text
-        if self.detect_language(text) == 'tamil':
+        if language == 'tamil':
             text_lower = self.tamil_processor.normalize_tamil_text(text)
-        
+
         # Remove extra whitespace
         text_lower = ' '.join(text_lower.split())
-        
+
         return text_lower
     
     def extract_service_type(self, text: str) -> str:
         """Extract service type from user query"""
-        text_lower = text.lower()
-        
-        for service, keywords in self.service_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return service
-        
-        return 'general'
-    
+        return self._service_matcher(text.lower()) or 'general'
+
     def extract_intent(self, text: str) -> str:
-        """Extract user intent from query"""
-        text_lower = text.lower()
-        
-        # Check intents in priority order (specific to general)
-        # Order is important - check download before apply, etc.
-        for intent, keywords in self.intent_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    return intent  # Return first match (most specific)
-        
-        return 'general_inquiry'
+        """
+        Extract user intent from query
+
+        Intent priority follows intent_keywords table order (specific to
+        general) - download is checked before apply, etc.
+        """
+        return self._intent_matcher(text.lower()) or 'general_inquiry'
     
     def analyze_query(self, user_query: str) -> Dict:
         """
@@ -189,7 +285,7 @@ class BilingualNLPEngine:
         - Keywords
         """
         language = self.detect_language(user_query)
-        preprocessed_text = self.preprocess_text(user_query)
+        preprocessed_text = self.preprocess_text(user_query, language=language)
         intent = self.extract_intent(preprocessed_text)
         service_type = self.extract_service_type(preprocessed_text)
         
@@ -212,23 +308,11 @@ class BilingualNLPEngine:
     
     def is_greeting(self, text: str) -> bool:
         """Check if text is a greeting"""
-        greetings = [
-            'வணக்கம்', 'hello', 'hi', 'hey', 'good morning', 'good afternoon',
-            'good evening', 'வாழ்த்துக்கள்', 'நல்ல காலை', 'நல்ல பிற்பகல்'
-        ]
-        
-        text_lower = text.lower()
-        return any(greeting in text_lower for greeting in greetings)
-    
+        return _GREETING_RE.search(text.lower()) is not None
+
     def is_farewell(self, text: str) -> bool:
         """Check if text is a farewell"""
-        farewells = [
-            'bye', 'goodbye', 'see you', 'thanks', 'thank you',
-            'நன்றி', 'போய்வருகிறேன்', 'பிறகு பார்ப்போம்'
-        ]
-        
-        text_lower = text.lower()
-        return any(farewell in text_lower for farewell in farewells)
+        return _FAREWELL_RE.search(text.lower()) is not None
 
 
 def test_nlp_engine():
@@ -25,17 +25,22 @@ def resize_icon(input_path, output_dir):
         if img.mode != 'RGBA':
             img = img.convert('RGBA')
         
-        # Define sizes needed for Chrome extension
-        sizes = [16, 48, 128]
-        
+        # Sizes needed for Chrome extension, largest first: each icon is
+        # resized from the previous (already small) result, so LANCZOS
+        # only runs over the full-resolution source once
+        sizes = [128, 48, 16]
+        source = img
+
         for size in sizes:
             # Resize using high-quality LANCZOS resampling
-            resized = img.resize((size, size), Image.Resampling.LANCZOS)
-            
+            resized = source.resize((size, size), Image.Resampling.LANCZOS)
+
             # Save the resized image
             output_path = os.path.join(output_dir, f'icon-{size}.png')
             resized.save(output_path, 'PNG', optimize=True)
             print(f"✓ Created {output_path} ({size}x{size})")
+
+            source = resized
         
         print("\n✓ All icons created successfully!")
         return True